@@ -0,0 +1,57 @@
+import json
+import math
+import platform
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def latency_summary(latencies_ms: List[float], elapsed_s: float) -> Dict[str, float]:
+    """p50/p95/p99 latency and throughput for a run"""
+    return {
+        "requests": len(latencies_ms),
+        "p50_ms": round(percentile(latencies_ms, 50), 2),
+        "p95_ms": round(percentile(latencies_ms, 95), 2),
+        "p99_ms": round(percentile(latencies_ms, 99), 2),
+        "throughput_rps": round(len(latencies_ms) / elapsed_s, 2) if elapsed_s else 0.0
+    }
+
+
+def write_results(name: str, results: Any, output: Optional[str] = None) -> Optional[Path]:
+    """Write benchmark results as JSON, with enough environment info to compare runs"""
+    if not output:
+        return None
+
+    path = Path(output)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "benchmark": name,
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "results": results
+        }, f, indent=2)
+    return path
+
+
+def print_table(rows: List[Dict[str, Any]]):
+    """Print a list of flat dicts as an aligned text table"""
+    if not rows:
+        return
+    columns = list(rows[0].keys())
+    widths = {c: max(len(str(c)), *(len(str(r.get(c, ""))) for r in rows)) for c in columns}
+    print("  ".join(str(c).ljust(widths[c]) for c in columns))
+    for row in rows:
+        print("  ".join(str(row.get(c, "")).ljust(widths[c]) for c in columns))
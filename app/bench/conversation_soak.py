@@ -0,0 +1,91 @@
+"""
+Soak test for the conversation store: stream a large number of distinct conversation
+IDs through it and sample process RSS, which should level off once the store is full.
+
+    python -m app.bench.conversation_soak --backend memory --conversations 2000000
+"""
+import argparse
+import os
+import resource
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from app.bench.common import print_table, write_results
+from app.services.conversation_store import MemoryConversationStore, SQLiteConversationStore
+
+
+def rss_mb() -> float:
+    """Current resident set size (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    tmp = tempfile.TemporaryDirectory()
+    if args.backend == "sqlite":
+        store = SQLiteConversationStore(
+            path=os.path.join(tmp.name, "conversations.sqlite3"),
+            max_conversations=args.max_conversations,
+            ttl_seconds=args.ttl_seconds
+        )
+    else:
+        store = MemoryConversationStore(max_conversations=args.max_conversations, ttl_seconds=args.ttl_seconds)
+
+    question = "How do I run the API locally? " * 4
+    answer = "Use docker compose up, then open http://localhost:8000/docs. " * 8
+    checkpoint = max(1, args.conversations // args.samples)
+
+    rows = []
+    start = time.perf_counter()
+    for i in range(args.conversations):
+        conversation_id = f"soak-{i}"
+        for _ in range(args.turns):
+            store.append(conversation_id, [("user", question), ("assistant", answer)], args.max_messages)
+        # Revisit a recent conversation, as follow-up questions would
+        if i and i % 10 == 0:
+            store.get(f"soak-{i - 5}")
+
+        if (i + 1) % checkpoint == 0:
+            rows.append({
+                "conversations_seen": i + 1,
+                "stored": len(store),
+                "evictions": store.evictions,
+                "rss_mb": round(rss_mb(), 1),
+                "elapsed_s": round(time.perf_counter() - start, 1)
+            })
+            if args.verbose:
+                print(rows[-1])
+
+    store.close()
+    tmp.cleanup()
+
+    # RSS growth over the second half of the run, once the store is at capacity
+    half = rows[len(rows) // 2]["rss_mb"]
+    rows[-1]["rss_growth_second_half_mb"] = round(rows[-1]["rss_mb"] - half, 1)
+    return rows
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["memory", "sqlite"], default="memory")
+    parser.add_argument("--conversations", type=int, default=1000000, help="Distinct conversation IDs to create")
+    parser.add_argument("--turns", type=int, default=1, help="Exchanges per conversation")
+    parser.add_argument("--max-conversations", type=int, default=10000)
+    parser.add_argument("--max-messages", type=int, default=20)
+    parser.add_argument("--ttl-seconds", type=float, default=3600)
+    parser.add_argument("--samples", type=int, default=20, help="RSS samples over the run")
+    parser.add_argument("--verbose", action="store_true")
+    parser.add_argument("--output", help="Write JSON results to this path")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    rows = main(args)
+    print_table(rows)
+    write_results("conversation_soak", rows, args.output)
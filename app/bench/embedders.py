@@ -0,0 +1,115 @@
+"""
+Compare embedding backends: chunk embeddings/sec, single-query latency and retrieval
+agreement with the full-precision baseline on the documents/ corpus.
+
+    python -m app.bench.embedders --backends huggingface torch-int8 onnx
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from app.bench.common import percentile, print_table, write_results
+from app.bench.retrieval_recall import DATA_FILE, DOCUMENTS_FOLDER
+
+
+def _load_chunks(settings) -> List[str]:
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=settings.chunk_size,
+        chunk_overlap=settings.chunk_overlap,
+        length_function=len,
+        separators=["\n\n", "\n", " ", ""]
+    )
+    chunks = []
+    for path in sorted(DOCUMENTS_FOLDER.glob("*.md")):
+        chunks.extend(splitter.split_text(path.read_text(encoding="utf-8")))
+    return chunks
+
+
+def _top_k(query_vectors: np.ndarray, chunk_vectors: np.ndarray, k: int) -> List[List[int]]:
+    scores = query_vectors @ chunk_vectors.T
+    return [list(np.argsort(-row)[:k]) for row in scores]
+
+
+def main(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    from app.core.config import Settings
+    from app.services.embedders import build_embedder
+
+    queries = [item["query"] for item in json.loads(Path(DATA_FILE).read_text(encoding="utf-8"))]
+    base_settings = Settings(openai_api_key="unused")
+    chunks = _load_chunks(base_settings)
+
+    rows = []
+    baseline = None
+    for backend in args.backends:
+        settings = Settings(openai_api_key="unused", embedding_backend=backend, embedding_threads=args.threads)
+        embedder = build_embedder(settings)
+        embedder.embed_documents(chunks[:8])  # warm-up
+
+        start = time.perf_counter()
+        chunk_vectors = np.asarray(embedder.embed_documents(chunks), dtype=np.float32)
+        docs_per_sec = len(chunks) / (time.perf_counter() - start)
+
+        latencies = []
+        query_vectors = []
+        for query in queries:
+            start = time.perf_counter()
+            query_vectors.append(embedder.embed_query(query))
+            latencies.append((time.perf_counter() - start) * 1000)
+        query_vectors = np.asarray(query_vectors, dtype=np.float32)
+
+        # Normalize so dot products are cosine similarities for every backend
+        chunk_vectors /= np.linalg.norm(chunk_vectors, axis=1, keepdims=True)
+        query_vectors /= np.linalg.norm(query_vectors, axis=1, keepdims=True)
+        top_k = _top_k(query_vectors, chunk_vectors, args.k)
+
+        row = {
+            "backend": embedder.cache_key,
+            "chunks": len(chunks),
+            "embeddings_per_sec": round(docs_per_sec, 1),
+            "query_p50_ms": round(percentile(latencies, 50), 2),
+            "query_p99_ms": round(percentile(latencies, 99), 2)
+        }
+
+        if baseline is None:
+            baseline = (chunk_vectors, top_k)
+            row.update({"mean_cosine_vs_baseline": 1.0, f"top{args.k}_overlap": 1.0, "within_tolerance": True})
+        else:
+            base_vectors, base_top_k = baseline
+            cosine = float(np.mean(np.sum(base_vectors * chunk_vectors, axis=1)))
+            overlap = float(np.mean([
+                len(set(a) & set(b)) / args.k for a, b in zip(base_top_k, top_k)
+            ]))
+            row.update({
+                "mean_cosine_vs_baseline": round(cosine, 4),
+                f"top{args.k}_overlap": round(overlap, 3),
+                "within_tolerance": overlap >= args.min_overlap
+            })
+        rows.append(row)
+
+    return rows
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["huggingface", "torch-int8", "onnx"],
+                        help="Backends to compare; the first one is the baseline")
+    parser.add_argument("--threads", type=int, default=0, help="EMBEDDING_THREADS (0 = library default)")
+    parser.add_argument("--k", type=int, default=5, help="Top-k used for the retrieval agreement check")
+    parser.add_argument("--min-overlap", type=float, default=0.8, help="Required top-k overlap with the baseline")
+    parser.add_argument("--output", help="Write JSON results to this path")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    rows = main(args)
+    print_table(rows)
+    write_results("embedders", rows, args.output)
+    if not all(row["within_tolerance"] for row in rows):
+        raise SystemExit("Retrieval results differ from the baseline beyond the tolerance")
@@ -0,0 +1,116 @@
+"""
+Load test ChatService's LLM path against the local OpenAI stub.
+
+Every request uses its own random temperature/max_tokens; the stub echoes them back,
+so any parameter bleed between concurrent requests is counted.
+
+    python -m app.bench.llm_load --concurrency 1 16 64 256 --requests 512
+"""
+import argparse
+import asyncio
+import random
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+from app.bench.common import latency_summary, print_table, write_results
+
+
+def start_stub(port: int, extra_args: List[str]) -> subprocess.Popen:
+    """Run the OpenAI stub in a child process and wait until it accepts requests"""
+    import httpx
+
+    process = subprocess.Popen(
+        [sys.executable, "-m", "app.bench.openai_stub", "--port", str(port), *extra_args]
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/stats", timeout=1)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("OpenAI stub did not start")
+
+
+async def _run(chat_service, concurrency: int, requests: int) -> Dict[str, Any]:
+    from langchain.schema import HumanMessage
+
+    latencies: List[float] = []
+    bleed = 0
+    errors = 0
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(i)
+
+    async def client():
+        nonlocal bleed, errors
+        while not queue.empty():
+            queue.get_nowait()
+            temperature = round(random.uniform(0, 1), 2)
+            max_tokens = random.randint(16, 1024)
+            start = time.perf_counter()
+            try:
+                answer = await chat_service._generate([HumanMessage(content="ping")], temperature, max_tokens)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+            if f"temperature={temperature} max_tokens={max_tokens}" not in answer:
+                bleed += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return {**latency_summary(latencies, time.perf_counter() - start), "param_bleed": bleed, "errors": errors}
+
+
+async def main(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    from app.core.config import Settings
+    from app.services.chat_service import ChatService
+
+    settings = Settings(
+        openai_api_key="stub",
+        openai_base_url=f"http://127.0.0.1:{args.port}/v1",
+        openai_api_type="openai",
+        openai_model="stub",
+        llm_max_concurrency=args.max_in_flight
+    )
+    # Only the LLM path is exercised, so no document service is needed
+    chat_service = ChatService(settings, document_service=None)
+
+    rows = []
+    try:
+        for concurrency in args.concurrency:
+            summary = await _run(chat_service, concurrency, args.requests)
+            rows.append({"concurrency": concurrency, "max_in_flight": args.max_in_flight, **summary})
+    finally:
+        await chat_service.cleanup()
+    return rows
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64, 256])
+    parser.add_argument("--requests", type=int, default=512, help="Requests per concurrency level")
+    parser.add_argument("--max-in-flight", type=int, default=16, help="LLM_MAX_CONCURRENCY for the run")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--stub-latency-ms", type=float, default=200.0)
+    parser.add_argument("--stub-rate-limit-prob", type=float, default=0.0)
+    parser.add_argument("--output", help="Write JSON results to this path")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    stub = start_stub(args.port, [
+        "--latency-ms", str(args.stub_latency_ms),
+        "--rate-limit-prob", str(args.stub_rate_limit_prob)
+    ])
+    try:
+        rows = asyncio.run(main(args))
+    finally:
+        stub.terminate()
+    print_table(rows)
+    write_results("llm_load", rows, args.output)
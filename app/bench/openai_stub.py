@@ -0,0 +1,146 @@
+"""
+Local OpenAI-compatible chat completions stub for offline benchmarks.
+
+    python -m app.bench.openai_stub --port 8900 --latency-ms 300 --latency-dist lognormal
+
+Answers echo the request's temperature and max_tokens so load tests can check
+that generation parameters do not bleed between concurrent requests.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from typing import Any, Dict
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+def sample_latency(config: Dict[str, Any]) -> float:
+    """Draw one latency in seconds from the configured distribution"""
+    mean = config["latency_ms"] / 1000
+    dist = config["latency_dist"]
+    if dist == "uniform":
+        spread = config["jitter_ms"] / 1000
+        return max(0.0, random.uniform(mean - spread, mean + spread))
+    if dist == "exponential":
+        return random.expovariate(1 / mean) if mean else 0.0
+    if dist == "lognormal":
+        # sigma controls the tail; median stays at latency_ms
+        return random.lognormvariate(0, config["sigma"]) * mean
+    return mean
+
+
+def create_app(config: Dict[str, Any]) -> FastAPI:
+    app = FastAPI(title="OpenAI stub")
+    app.state.requests = 0
+
+    @app.post("/v1/chat/completions")
+    @app.post("/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+
+        if random.random() < config["rate_limit_prob"]:
+            return JSONResponse(
+                status_code=429,
+                content={"error": {"message": "Rate limit reached", "type": "rate_limit_error", "code": "rate_limit"}}
+            )
+
+        temperature = body.get("temperature")
+        max_tokens = body.get("max_tokens")
+        prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in body.get("messages", []))
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        model = body.get("model", "stub")
+
+        words = [f"temperature={temperature}", f"max_tokens={max_tokens}"]
+        words += [f"token{i}" for i in range(config["tokens"])]
+
+        if not body.get("stream"):
+            await asyncio.sleep(sample_latency(config))
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": " ".join(words)},
+                    "finish_reason": "stop"
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": len(words),
+                    "total_tokens": prompt_tokens + len(words)
+                }
+            }
+
+        async def stream():
+            # Time to first token follows the latency distribution, then tokens trickle out
+            await asyncio.sleep(sample_latency(config))
+            for i, word in enumerate(words):
+                chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": (" " if i else "") + word}, "finish_reason": None}]
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+                if config["token_interval_ms"]:
+                    await asyncio.sleep(config["token_interval_ms"] / 1000)
+            final = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]
+            }
+            yield f"data: {json.dumps(final)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    @app.get("/stats")
+    async def stats():
+        return {"requests": app.state.requests}
+
+    return app
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Mean/median response latency")
+    parser.add_argument("--latency-dist", choices=["fixed", "uniform", "exponential", "lognormal"], default="fixed")
+    parser.add_argument("--jitter-ms", type=float, default=50.0, help="Half-width for the uniform distribution")
+    parser.add_argument("--sigma", type=float, default=0.5, help="Shape for the lognormal distribution")
+    parser.add_argument("--tokens", type=int, default=50, help="Completion tokens per answer")
+    parser.add_argument("--token-interval-ms", type=float, default=5.0, help="Delay between streamed tokens")
+    parser.add_argument("--rate-limit-prob", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--seed", type=int, help="Seed the latency draws so runs are repeatable")
+    return parser
+
+
+def config_from_args(args: argparse.Namespace) -> Dict[str, Any]:
+    return {
+        "latency_ms": args.latency_ms,
+        "latency_dist": args.latency_dist,
+        "jitter_ms": args.jitter_ms,
+        "sigma": args.sigma,
+        "tokens": args.tokens,
+        "token_interval_ms": args.token_interval_ms,
+        "rate_limit_prob": args.rate_limit_prob,
+    }
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    args = build_parser().parse_args()
+    if args.seed is not None:
+        random.seed(args.seed)
+    uvicorn.run(create_app(config_from_args(args)), host=args.host, port=args.port, log_level="warning")
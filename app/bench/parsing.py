@@ -0,0 +1,132 @@
+"""
+Compare files/sec of the thread and process parsing backends on a mixed md/pdf/docx corpus.
+
+    python -m app.bench.parsing --copies 20
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+from app.bench.common import print_table, write_results
+from app.services.document_loaders import load_file
+
+SOURCE_FOLDER = Path(__file__).resolve().parents[2] / "documents"
+
+
+def _write_pdf(path: Path, lines: List[str]):
+    """Write a minimal single-font PDF, one page per 50 lines"""
+    pages = [lines[i:i + 50] for i in range(0, len(lines), 50)] or [[""]]
+    objects: List[bytes] = []
+
+    def add(body: str) -> int:
+        objects.append(body.encode("latin-1", "replace"))
+        return len(objects)
+
+    font_id = add("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    pages_id = len(objects) + 1 + 2 * len(pages)
+    page_ids = []
+    for page_lines in pages:
+        text = " ".join(
+            "(" + line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ") Tj T*"
+            for line in page_lines
+        )
+        stream = f"BT /F1 10 Tf 12 TL 40 800 Td {text} ET"
+        content_id = add(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        page_ids.append(add(
+            f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {content_id} 0 R >>"
+        ))
+    add(f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>")
+    catalog_id = add(f"<< /Type /Catalog /Pages {pages_id} 0 R >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref_offset = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root {catalog_id} 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+    path.write_bytes(bytes(out))
+
+
+def _write_docx(path: Path, lines: List[str]):
+    from docx import Document as DocxDocument
+
+    document = DocxDocument()
+    for line in lines:
+        document.add_paragraph(line)
+    document.save(str(path))
+
+
+def build_mixed_corpus(target: Path, copies: int) -> List[Path]:
+    """Write each markdown document as .md, .pdf and .docx, `copies` times"""
+    files = []
+    for source in sorted(SOURCE_FOLDER.glob("*.md")):
+        lines = [line for line in source.read_text(encoding="utf-8").splitlines() if line.strip()]
+        for copy in range(copies):
+            stem = f"{source.stem}_{copy}"
+            md_path = target / f"{stem}.md"
+            shutil.copyfile(source, md_path)
+            pdf_path = target / f"{stem}.pdf"
+            _write_pdf(pdf_path, lines)
+            docx_path = target / f"{stem}.docx"
+            _write_docx(docx_path, lines)
+            files.extend([md_path, pdf_path, docx_path])
+    return files
+
+
+def _parse_all(executor: Executor, files: List[Path]) -> Dict[str, Any]:
+    start = time.perf_counter()
+    pages = sum(len(result) for result in executor.map(load_file, [str(f) for f in files]))
+    elapsed = time.perf_counter() - start
+    return {
+        "files": len(files),
+        "pages": pages,
+        "seconds": round(elapsed, 2),
+        "files_per_sec": round(len(files) / elapsed, 2)
+    }
+
+
+def main(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    workdir = Path(tempfile.mkdtemp(prefix="bench_parsing_"))
+    try:
+        files = build_mixed_corpus(workdir, args.copies)
+        workers = args.workers or os.cpu_count() or 1
+        rows = []
+
+        with ThreadPoolExecutor(max_workers=args.threads) as executor:
+            rows.append({"backend": "thread", "workers": args.threads, **_parse_all(executor, files)})
+
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            # Start the workers before timing so interpreter spawn cost is not counted
+            list(executor.map(load_file, [str(files[0])] * workers))
+            rows.append({"backend": "process", "workers": workers, **_parse_all(executor, files)})
+
+        return rows
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--copies", type=int, default=10, help="Copies of each document per format")
+    parser.add_argument("--threads", type=int, default=4, help="Thread backend size (matches DocumentService)")
+    parser.add_argument("--workers", type=int, default=0, help="Process backend size (0 = CPU count)")
+    parser.add_argument("--output", help="Write JSON results to this path")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    rows = main(args)
+    print_table(rows)
+    write_results("parsing", rows, args.output)
@@ -0,0 +1,97 @@
+"""
+Benchmark query-embedding latency and throughput with and without micro-batching.
+
+    python -m app.bench.query_batching --clients 1 8 64 --requests 256
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
+
+from app.bench.common import latency_summary, print_table, write_results
+from app.services.embedding_batcher import QueryEmbeddingBatcher
+
+QUESTIONS = [
+    "How do I set up docker for this project?",
+    "What is the git flow we use?",
+    "Which statuses can a Jira ticket move through?",
+    "Where is the ChromaDB data stored?",
+    "How do I run the API locally?",
+    "What are the coding best practices?",
+    "How does the chat endpoint use retrieved documents?",
+    "Which environment variables are required?",
+]
+
+
+def _queries(count: int) -> List[str]:
+    # Unique texts so nothing can be deduplicated across the run
+    return [f"{QUESTIONS[i % len(QUESTIONS)]} (#{i})" for i in range(count)]
+
+
+async def _run(embed, clients: int, queries: List[str]) -> Dict[str, Any]:
+    """Drive `embed` from `clients` concurrent workers over the query list"""
+    latencies: List[float] = []
+    queue: asyncio.Queue = asyncio.Queue()
+    for query in queries:
+        queue.put_nowait(query)
+
+    async def client():
+        while not queue.empty():
+            query = queue.get_nowait()
+            start = time.perf_counter()
+            await embed(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return latency_summary(latencies, time.perf_counter() - start)
+
+
+async def main(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    from app.core.config import Settings
+    from app.services.embedders import build_embedder
+
+    model = build_embedder(Settings(openai_api_key="unused", embedding_backend=args.backend))
+    executor = ThreadPoolExecutor(max_workers=4)
+    loop = asyncio.get_running_loop()
+
+    # Warm up the model so the first measured call is not a cold start
+    model.embed_documents(QUESTIONS)
+
+    async def unbatched(query: str):
+        return await loop.run_in_executor(executor, model.embed_query, query)
+
+    rows = []
+    for clients in args.clients:
+        batcher = QueryEmbeddingBatcher(
+            embed_fn=model.embed_documents,
+            executor=executor,
+            window_ms=args.window_ms,
+            max_batch_size=args.max_batch_size
+        )
+        for mode, embed in (("unbatched", unbatched), ("batched", batcher.embed)):
+            summary = await _run(embed, clients, _queries(args.requests))
+            rows.append({"mode": mode, "clients": clients, **summary})
+        rows[-1]["avg_batch_size"] = batcher.stats()["avg_batch_size"]
+
+    executor.shutdown(wait=True)
+    return rows
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 64])
+    parser.add_argument("--requests", type=int, default=256, help="Queries per run")
+    parser.add_argument("--window-ms", type=float, default=5.0)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--backend", default="huggingface", help="Embedding backend to benchmark")
+    parser.add_argument("--output", help="Write JSON results to this path")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    rows = asyncio.run(main(args))
+    print_table(rows)
+    write_results("query_batching", rows, args.output)
@@ -0,0 +1,89 @@
+"""
+Recall@k of dense-only vs hybrid (BM25 + dense, reciprocal rank fusion) retrieval
+on a labelled query set over documents/.
+
+    python -m app.bench.retrieval_recall --k 1 3 5
+"""
+import argparse
+import asyncio
+import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from app.bench.common import percentile, print_table, write_results
+
+DATA_FILE = Path(__file__).parent / "data" / "retrieval_queries.json"
+DOCUMENTS_FOLDER = Path(__file__).resolve().parents[2] / "documents"
+
+
+def _hit(docs: List[Dict[str, Any]], expected: List[str]) -> bool:
+    return any(doc["metadata"].get("file_name") in expected for doc in docs)
+
+
+async def main(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    from app.core.config import Settings
+    from app.services.document_service import DocumentService
+    from app.services.lexical_index import reciprocal_rank_fusion
+
+    queries = json.loads(Path(args.queries).read_text(encoding="utf-8"))
+    workdir = Path(tempfile.mkdtemp(prefix="bench_recall_"))
+    try:
+        settings = Settings(
+            openai_api_key="unused",
+            chroma_db_path=str(workdir / "chroma_db"),
+            documents_folder=str(DOCUMENTS_FOLDER),
+            hybrid_search_enabled=True,
+            embedding_cache_enabled=False
+        )
+        service = DocumentService(settings)
+        await service.auto_load_documents()
+
+        max_k = max(args.k)
+        candidates = max(max_k, settings.hybrid_candidates)
+        hits = {(mode, k): 0 for mode in ("dense", "hybrid") for k in args.k}
+        lexical_ms: List[float] = []
+
+        for item in queries:
+            embedding = await service.embed_query(item["query"])
+            dense = await service._dense_search(embedding, candidates)
+
+            start = time.perf_counter()
+            lexical = service.active.lexical_index.search(item["query"], candidates)
+            lexical_ms.append((time.perf_counter() - start) * 1000)
+
+            hybrid = reciprocal_rank_fusion([dense, lexical], max_k, settings.rrf_k)
+            for k in args.k:
+                hits[("dense", k)] += _hit(dense[:k], item["expected"])
+                hits[("hybrid", k)] += _hit(hybrid[:k], item["expected"])
+
+        await service.cleanup()
+
+        rows = []
+        for mode in ("dense", "hybrid"):
+            row = {"mode": mode}
+            for k in args.k:
+                row[f"recall@{k}"] = round(hits[(mode, k)] / len(queries), 3)
+            rows.append(row)
+        rows[-1]["lexical_p50_ms"] = round(percentile(lexical_ms, 50), 3)
+        rows[-1]["lexical_p99_ms"] = round(percentile(lexical_ms, 99), 3)
+        return rows
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5])
+    parser.add_argument("--queries", default=str(DATA_FILE), help="Labelled queries JSON")
+    parser.add_argument("--output", help="Write JSON results to this path")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    rows = asyncio.run(main(args))
+    print_table(rows)
+    write_results("retrieval_recall", rows, args.output)
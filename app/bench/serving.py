@@ -0,0 +1,125 @@
+"""
+Throughput of the full /chat endpoint across worker counts (python -m app.serve),
+with the LLM replaced by the local OpenAI stub so retrieval and serving dominate.
+
+    python -m app.bench.serving --workers 1 2 4 --concurrency 32 --requests 512
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+from app.bench.common import latency_summary, print_table, write_results
+from app.bench.llm_load import start_stub
+from app.bench.query_batching import QUESTIONS
+
+
+def start_server(workers: int, port: int, embedding_port: int, env: Dict[str, str], wait_seconds: float) -> subprocess.Popen:
+    """Run the API in serving mode and wait until /ready reports the index loaded"""
+    import httpx
+
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "app.serve",
+            "--workers", str(workers),
+            "--host", "127.0.0.1",
+            "--port", str(port),
+            "--embedding-port", str(embedding_port)
+        ],
+        env=env
+    )
+    deadline = time.time() + wait_seconds
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/ready", timeout=1).raise_for_status()
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError("Server did not start")
+
+
+async def run_chat_load(port: int, concurrency: int, requests: int, offset: int = 0) -> Dict[str, Any]:
+    """POST `requests` distinct questions to /chat from `concurrency` clients; latency summary and errors"""
+    import httpx
+
+    latencies: List[float] = []
+    errors = 0
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(offset, offset + requests):
+        # Distinct questions so the query and answer caches do not short-circuit the work
+        queue.put_nowait(f"{QUESTIONS[i % len(QUESTIONS)]} (#{i})")
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=120, limits=limits) as client:
+        async def worker():
+            nonlocal errors
+            while not queue.empty():
+                message = queue.get_nowait()
+                start = time.perf_counter()
+                try:
+                    response = await client.post("/chat", json={"message": message})
+                    response.raise_for_status()
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return {**latency_summary(latencies, time.perf_counter() - start), "errors": errors}
+
+
+def main(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    env = {
+        **os.environ,
+        "OPENAI_API_KEY": "stub",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{args.stub_port}/v1",
+        "OPENAI_API_TYPE": "openai",
+        "OPENAI_MODEL": "stub",
+        "LLM_MAX_CONCURRENCY": str(args.concurrency),
+        "HISTORY_SUMMARY_ENABLED": "false"
+    }
+
+    rows = []
+    for workers in args.workers:
+        server = start_server(workers, args.port, args.embedding_port, env, args.startup_timeout)
+        try:
+            # Warm-up so model loading and first-request costs are not measured
+            asyncio.run(run_chat_load(args.port, min(args.concurrency, 8), 16))
+            summary = asyncio.run(run_chat_load(args.port, args.concurrency, args.requests))
+        finally:
+            server.terminate()
+            server.wait(timeout=60)
+        rows.append({"workers": workers, "concurrency": args.concurrency, **summary})
+    return rows
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=512, help="Requests per worker count")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--embedding-port", type=int, default=8101)
+    parser.add_argument("--stub-port", type=int, default=8900)
+    parser.add_argument("--stub-latency-ms", type=float, default=50.0)
+    parser.add_argument("--startup-timeout", type=float, default=600.0)
+    parser.add_argument("--output", help="Write JSON results to this path")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    stub = start_stub(args.stub_port, ["--latency-ms", str(args.stub_latency_ms)])
+    try:
+        rows = main(args)
+    finally:
+        stub.terminate()
+    print_table(rows)
+    write_results("serving", rows, args.output)
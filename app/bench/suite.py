@@ -0,0 +1,310 @@
+"""
+End-to-end offline benchmark: ingestion, retrieval and /chat latency on synthetic corpora
+of 10x/100x/1000x the size of documents/, with the LLM replaced by the local OpenAI stub.
+
+    python -m app.bench --scales 10 100 1000 --concurrency 1 8 32 --output bench_results/run.json
+
+For every scale the suite
+- generates the corpus from documents/ (seeded, so every run indexes the same text),
+- ingests it into a fresh Chroma directory in a child process and records files/sec,
+  chunks/sec, peak RSS and the latency of retrieval queries against the new index,
+- starts the API on that index (python -m app.serve) and measures /chat p50/p95/p99 and
+  throughput at each concurrency level.
+
+Index and model settings come from the environment as usual (e.g. CHUNK_SIZE=500,
+EMBEDDING_BACKEND=onnx), and the values in effect are written to the results so runs can be
+compared. The embedding cache is disabled so ingestion always embeds every chunk.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.bench.common import latency_summary, print_table, write_results
+from app.bench.llm_load import start_stub
+from app.bench.query_batching import QUESTIONS
+from app.bench.serving import run_chat_load, start_server
+
+DOCUMENTS_FOLDER = Path(__file__).resolve().parents[2] / "documents"
+
+# Settings that change what the benchmark measures, recorded with every run
+RECORDED_SETTINGS = [
+    "chunk_size",
+    "chunk_overlap",
+    "embedding_model",
+    "embedding_backend",
+    "parser_backend",
+    "ingest_batch_size",
+    "ingest_load_concurrency",
+    "chroma_read_workers",
+    "retrieval_k",
+    "hybrid_search_enabled",
+    "vector_index_enabled",
+    "rerank_enabled"
+]
+
+
+def build_corpus(target: Path, scale: int, seed: int) -> List[Path]:
+    """
+    Write `scale` variants of every document in documents/, each with its paragraphs in a
+    different (seeded) order, so chunk contents differ between copies like real documents do
+    """
+    rng = random.Random(seed)
+    files = []
+    for source in sorted(p for p in DOCUMENTS_FOLDER.rglob("*") if p.is_file()):
+        blocks = [block for block in source.read_text(encoding="utf-8").split("\n\n") if block.strip()]
+        head, body = blocks[:1], blocks[1:]
+        for copy in range(scale):
+            # Spread files over subfolders; some filesystems slow down with thousands per directory
+            folder = target / f"part_{copy // 100:03d}"
+            folder.mkdir(parents=True, exist_ok=True)
+            rng.shuffle(body)
+            path = folder / f"{source.stem}_{copy}{source.suffix}"
+            path.write_text("\n\n".join(head + body) + "\n", encoding="utf-8")
+            files.append(path)
+    return files
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process so far"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _process_peak_rss_mb(pid: int) -> Optional[float]:
+    """Peak RSS of another process, where the platform exposes it (Linux)"""
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def _bench_settings(corpus: Path, chroma_path: Path):
+    from app.core.config import Settings
+
+    return Settings(
+        openai_api_key="stub",
+        chroma_db_path=str(chroma_path),
+        documents_folder=str(corpus),
+        embedding_cache_enabled=False
+    )
+
+
+async def _ingest_and_query(corpus: Path, chroma_path: Path, queries: int) -> Dict[str, Any]:
+    from app.services.document_service import DocumentService
+
+    settings = _bench_settings(corpus, chroma_path)
+    service = DocumentService(settings)
+    try:
+        # Load the embedding model before timing, as a running server would have
+        await service.embed_query("warm-up")
+
+        progress: Dict[str, Any] = {}
+        start = time.perf_counter()
+        await service.refresh_documents(progress=progress)
+        elapsed = time.perf_counter() - start
+        files = progress.get("files_added", 0)
+        chunks = progress.get("chunks_added", 0)
+
+        # Distinct texts so the query embedding cache cannot answer from memory
+        latencies: List[float] = []
+        for i in range(queries):
+            query = f"{QUESTIONS[i % len(QUESTIONS)]} (#{i})"
+            query_start = time.perf_counter()
+            await service.search_similar_documents(query)
+            latencies.append((time.perf_counter() - query_start) * 1000)
+        retrieval = latency_summary(latencies, sum(latencies) / 1000)
+
+        return {
+            "files": files,
+            "files_failed": progress.get("files_failed", 0),
+            "chunks": chunks,
+            "ingest_seconds": round(elapsed, 2),
+            "files_per_sec": round(files / elapsed, 2) if elapsed else 0.0,
+            "chunks_per_sec": round(chunks / elapsed, 2) if elapsed else 0.0,
+            "peak_rss_mb": _peak_rss_mb(),
+            "retrieval_p50_ms": retrieval["p50_ms"],
+            "retrieval_p95_ms": retrieval["p95_ms"],
+            "retrieval_p99_ms": retrieval["p99_ms"]
+        }
+    finally:
+        await service.cleanup()
+
+
+def ingest_and_query(corpus: str, chroma_path: str, queries: int) -> Dict[str, Any]:
+    """Entry point of the child process, so peak RSS covers this scale alone"""
+    return asyncio.run(_ingest_and_query(Path(corpus), Path(chroma_path), queries))
+
+
+def recorded_settings() -> Dict[str, Any]:
+    from app.core.config import Settings
+
+    settings = Settings(openai_api_key="stub")
+    return {name: getattr(settings, name) for name in RECORDED_SETTINGS}
+
+
+def _chat_rows(args: argparse.Namespace, scale: int, corpus: Path, chroma_path: Path) -> List[Dict[str, Any]]:
+    env = {
+        **os.environ,
+        "OPENAI_API_KEY": "stub",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{args.stub_port}/v1",
+        "OPENAI_API_TYPE": "openai",
+        "OPENAI_MODEL": "stub",
+        "DOCUMENTS_FOLDER": str(corpus),
+        "CHROMA_DB_PATH": str(chroma_path),
+        "EMBEDDING_CACHE_ENABLED": "false",
+        "LLM_MAX_CONCURRENCY": str(max(args.concurrency)),
+        "HISTORY_SUMMARY_ENABLED": "false"
+    }
+    server = start_server(args.workers, args.port, args.embedding_port, env, args.startup_timeout)
+    rows = []
+    try:
+        # Warm-up so first-request costs are not measured
+        asyncio.run(run_chat_load(args.port, min(max(args.concurrency), 8), 16))
+        offset = 16
+        for concurrency in args.concurrency:
+            # Questions never repeat within a run, so every level misses the query caches alike
+            summary = asyncio.run(run_chat_load(args.port, concurrency, args.requests, offset))
+            offset += args.requests
+            rows.append({"scale": scale, "workers": args.workers, "concurrency": concurrency, **summary})
+        peak_rss = _process_peak_rss_mb(server.pid)
+        for row in rows:
+            row["server_peak_rss_mb"] = peak_rss
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+    return rows
+
+
+def main(args: argparse.Namespace) -> Dict[str, Any]:
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="bench_suite_"))
+    ingestion_rows = []
+    chat_rows = []
+    try:
+        for scale in args.scales:
+            corpus = workdir / f"scale_{scale}" / "documents"
+            chroma_path = workdir / f"scale_{scale}" / "chroma_db"
+            shutil.rmtree(corpus.parent, ignore_errors=True)
+
+            corpus_files = build_corpus(corpus, scale, args.seed)
+            corpus_mb = sum(f.stat().st_size for f in corpus_files) / (1024 * 1024)
+            print(f"Scale {scale}x: {len(corpus_files)} files, {corpus_mb:.1f} MB", flush=True)
+
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+                ingestion = executor.submit(
+                    ingest_and_query, str(corpus), str(chroma_path), args.retrieval_queries
+                ).result()
+            ingestion_rows.append({"scale": scale, "corpus_mb": round(corpus_mb, 2), **ingestion})
+
+            if args.requests > 0:
+                chat_rows.extend(_chat_rows(args, scale, corpus, chroma_path))
+
+            if not args.keep:
+                shutil.rmtree(corpus.parent, ignore_errors=True)
+    finally:
+        if not args.keep and not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "config": {
+            "scales": args.scales,
+            "seed": args.seed,
+            "retrieval_queries": args.retrieval_queries,
+            "chat_requests": args.requests,
+            "workers": args.workers,
+            "stub": _stub_config(args),
+            "settings": recorded_settings()
+        },
+        "ingestion": ingestion_rows,
+        "chat": chat_rows
+    }
+
+
+def _stub_config(args: argparse.Namespace) -> Dict[str, Any]:
+    return {
+        "latency_ms": args.stub_latency_ms,
+        "latency_dist": args.stub_latency_dist,
+        "jitter_ms": args.stub_jitter_ms,
+        "sigma": args.stub_sigma,
+        "tokens": args.stub_tokens,
+        "token_interval_ms": args.stub_token_interval_ms
+    }
+
+
+def _stub_args(args: argparse.Namespace) -> List[str]:
+    return [
+        "--latency-ms", str(args.stub_latency_ms),
+        "--latency-dist", args.stub_latency_dist,
+        "--jitter-ms", str(args.stub_jitter_ms),
+        "--sigma", str(args.stub_sigma),
+        "--tokens", str(args.stub_tokens),
+        "--token-interval-ms", str(args.stub_token_interval_ms),
+        "--seed", str(args.seed)
+    ]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.bench", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--scales", type=int, nargs="+", default=[10, 100, 1000], help="Corpus sizes as multiples of documents/")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32], help="Concurrent /chat clients")
+    parser.add_argument("--requests", type=int, default=200, help="/chat requests per concurrency level (0 = skip /chat)")
+    parser.add_argument("--retrieval-queries", type=int, default=200, help="Retrieval queries per scale")
+    parser.add_argument("--workers", type=int, default=1, help="API worker processes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--embedding-port", type=int, default=8101)
+    parser.add_argument("--stub-port", type=int, default=8900)
+    parser.add_argument("--stub-latency-ms", type=float, default=200.0, help="Mean/median LLM latency")
+    parser.add_argument("--stub-latency-dist", choices=["fixed", "uniform", "exponential", "lognormal"], default="lognormal")
+    parser.add_argument("--stub-jitter-ms", type=float, default=50.0, help="Half-width for the uniform distribution")
+    parser.add_argument("--stub-sigma", type=float, default=0.5, help="Shape for the lognormal distribution")
+    parser.add_argument("--stub-tokens", type=int, default=50, help="Completion tokens per answer")
+    parser.add_argument("--stub-token-interval-ms", type=float, default=5.0)
+    parser.add_argument("--startup-timeout", type=float, default=600.0)
+    parser.add_argument("--workdir", help="Where corpora and indexes are built (default: a temp dir)")
+    parser.add_argument("--keep", action="store_true", help="Keep generated corpora and indexes")
+    parser.add_argument(
+        "--output",
+        default=f"bench_results/suite_{datetime.now():%Y%m%d_%H%M%S}.json",
+        help="Write JSON results to this path"
+    )
+    return parser
+
+
+def run(argv: Optional[List[str]] = None):
+    args = build_parser().parse_args(argv)
+    stub = start_stub(args.stub_port, _stub_args(args)) if args.requests > 0 else None
+    try:
+        results = main(args)
+    finally:
+        if stub is not None:
+            stub.terminate()
+
+    print_table(results["ingestion"])
+    if results["chat"]:
+        print()
+        print_table(results["chat"])
+    path = write_results("suite", results, args.output)
+    if path is not None:
+        print(f"\nResults written to {path}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,108 @@
+"""
+Compare dense top-k latency of Chroma's collection.query with the in-process NumPy index.
+Uses random unit vectors, so no embedding model is needed.
+
+    python -m app.bench.vector_search --sizes 1000 5000 20000 --queries 200
+"""
+import argparse
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from app.bench.common import latency_summary, print_table, write_results
+from app.services.vector_index import VectorIndex
+
+
+def _unit_vectors(rng: np.random.Generator, count: int, dimension: int) -> np.ndarray:
+    vectors = rng.standard_normal((count, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _timed(search, queries: np.ndarray) -> Dict[str, Any]:
+    latencies = []
+    results = []
+    start = time.perf_counter()
+    for query in queries:
+        query_start = time.perf_counter()
+        results.append(search(query.tolist()))
+        latencies.append((time.perf_counter() - query_start) * 1000)
+    return {"summary": latency_summary(latencies, time.perf_counter() - start), "results": results}
+
+
+def main(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    import chromadb
+    from chromadb.config import Settings as ChromaSettings
+
+    rng = np.random.default_rng(args.seed)
+    rows = []
+
+    for size in args.sizes:
+        vectors = _unit_vectors(rng, size, args.dimension)
+        queries = _unit_vectors(rng, args.queries, args.dimension)
+        ids = [f"chunk_{i}" for i in range(size)]
+        texts = [f"chunk {i}" for i in range(size)]
+        metadatas = [{"source": f"doc_{i % 100}.md", "chunk_index": i} for i in range(size)]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            client = chromadb.PersistentClient(path=tmp, settings=ChromaSettings(anonymized_telemetry=False))
+            collection = client.create_collection("bench")
+            for start in range(0, size, 5000):
+                end = start + 5000
+                collection.add(
+                    ids=ids[start:end],
+                    embeddings=vectors[start:end].tolist(),
+                    documents=texts[start:end],
+                    metadatas=metadatas[start:end]
+                )
+
+            def chroma_search(query):
+                result = collection.query(
+                    query_embeddings=[query],
+                    n_results=args.k,
+                    include=["documents", "metadatas", "distances"]
+                )
+                return result["ids"][0]
+
+            chroma = _timed(chroma_search, queries)
+
+            for dtype in args.dtypes:
+                index = VectorIndex(path=f"{tmp}/vectors_{dtype}.mmap", dtype=dtype)
+                index.add(ids, texts, metadatas, vectors)
+                numpy_run = _timed(lambda query: [doc["id"] for doc in index.search(query, args.k)], queries)
+
+                # HNSW is approximate, so agreement is the share of Chroma's top k also found here
+                overlap = np.mean([
+                    len(set(a) & set(b)) / args.k
+                    for a, b in zip(chroma["results"], numpy_run["results"])
+                ])
+                rows.append({
+                    "chunks": size,
+                    "backend": f"numpy-{dtype}",
+                    **numpy_run["summary"],
+                    "topk_overlap_vs_chroma": round(float(overlap), 3)
+                })
+
+            rows.append({"chunks": size, "backend": "chroma", **chroma["summary"], "topk_overlap_vs_chroma": 1.0})
+
+    return rows
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000], help="Corpus sizes in chunks")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per run")
+    parser.add_argument("--dimension", type=int, default=768, help="Embedding dimension (768 for all-mpnet-base-v2)")
+    parser.add_argument("--dtypes", nargs="+", default=["float32", "float16"])
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON results to this path")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    rows = main(args)
+    print_table(rows)
+    write_results("vector_search", rows, args.output)
@@ -0,0 +1,73 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe in-process LRU cache with optional time-to-live"""
+
+    def __init__(self, maxsize: int, ttl_seconds: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value (refreshing its recency) or `default`"""
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is not _MISSING:
+                value, expires_at = item
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any):
+        """Insert or replace a value, evicting the least recently used entries"""
+        if self.maxsize <= 0:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove a key and return its value"""
+        with self._lock:
+            item = self._data.pop(key, _MISSING)
+            return default if item is _MISSING else item[0]
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and hit/miss counters"""
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4)
+        }
@@ -19,15 +19,69 @@ class Settings(BaseSettings):
     openai_api_type: str = Field(default="openai", env="OPENAI_API_TYPE")
     openai_api_version: str = Field(default="2023-05-15", env="OPENAI_API_VERSION")
 
+    # LLM client Settings
+    llm_max_concurrency: int = Field(default=16, env="LLM_MAX_CONCURRENCY")
+    llm_max_connections: int = Field(default=32, env="LLM_MAX_CONNECTIONS")
+    llm_keepalive_seconds: float = Field(default=30.0, env="LLM_KEEPALIVE_SECONDS")
+    llm_timeout_seconds: float = Field(default=60.0, env="LLM_TIMEOUT_SECONDS")
+    llm_max_retries: int = Field(default=3, env="LLM_MAX_RETRIES")
+    llm_retry_base_delay: float = Field(default=0.5, env="LLM_RETRY_BASE_DELAY")
+    llm_retry_max_delay: float = Field(default=8.0, env="LLM_RETRY_MAX_DELAY")
+
+    # Embedding Settings
+    # Backends: "huggingface" (full-precision PyTorch), "torch-int8" (dynamically quantized
+    # PyTorch), "onnx" (ONNX Runtime, int8-quantized unless EMBEDDING_ONNX_QUANTIZE=false)
+    # or "remote" (the shared embedding sidecar at EMBEDDING_SERVICE_URL)
+    embedding_model: str = Field(default="sentence-transformers/all-mpnet-base-v2", env="EMBEDDING_MODEL")
+    embedding_backend: str = Field(default="huggingface", env="EMBEDDING_BACKEND")
+    embedding_threads: int = Field(default=0, env="EMBEDDING_THREADS")
+    embedding_onnx_dir: str = Field(default="./models/all-mpnet-base-v2-onnx", env="EMBEDDING_ONNX_DIR")
+    embedding_onnx_quantize: bool = Field(default=True, env="EMBEDDING_ONNX_QUANTIZE")
+    # Used by the "remote" backend: workers share one embedding sidecar (python -m app.embedding_server)
+    embedding_service_url: str = Field(default="http://127.0.0.1:8001", env="EMBEDDING_SERVICE_URL")
+    embedding_service_timeout: float = Field(default=60.0, env="EMBEDDING_SERVICE_TIMEOUT")
+
     # ChromaDB Settings
     chroma_db_path: str = Field(default="./chroma_db", env="CHROMA_DB_PATH")
     collection_name: str = Field(default="documents", env="COLLECTION_NAME")
+    index_manifest_file: str = Field(default="index_manifest.json", env="INDEX_MANIFEST_FILE")
+    chroma_read_workers: int = Field(default=4, env="CHROMA_READ_WORKERS")
+    chroma_query_concurrency: int = Field(default=4, env="CHROMA_QUERY_CONCURRENCY")
+    # How often a worker checks whether another worker published a new index generation
+    index_reload_interval_ms: int = Field(default=1000, env="INDEX_RELOAD_INTERVAL_MS")
+    # A full rebuild writes a new collection version; the replaced one is deleted after this
+    # long, so workers still serving it have time to reload
+    index_gc_grace_seconds: float = Field(default=60.0, env="INDEX_GC_GRACE_SECONDS")
+
+    # Embedding cache Settings
+    embedding_cache_enabled: bool = Field(default=True, env="EMBEDDING_CACHE_ENABLED")
+    embedding_cache_file: str = Field(default="embedding_cache.sqlite3", env="EMBEDDING_CACHE_FILE")
+    embedding_cache_max_entries: int = Field(default=100000, env="EMBEDDING_CACHE_MAX_ENTRIES")
 
     # Document Processing Settings
     chunk_size: int = Field(default=1000, env="CHUNK_SIZE")
     chunk_overlap: int = Field(default=200, env="CHUNK_OVERLAP")
     max_file_size_mb: int = Field(default=10, env="MAX_FILE_SIZE_MB")
 
+    # Ingestion pipeline Settings
+    ingest_batch_size: int = Field(default=64, env="INGEST_BATCH_SIZE")
+    ingest_queue_size: int = Field(default=256, env="INGEST_QUEUE_SIZE")
+    ingest_load_concurrency: int = Field(default=4, env="INGEST_LOAD_CONCURRENCY")
+    # How often the manifest is checkpointed during a sync (it is always saved at the end)
+    ingest_manifest_save_interval_seconds: float = Field(default=5.0, env="INGEST_MANIFEST_SAVE_INTERVAL_SECONDS")
+
+    # Ingestion jobs: at most this many run at once, further submissions queue up to
+    # ingest_max_queued_jobs and are rejected beyond that; finished jobs are kept for polling
+    ingest_max_concurrent_jobs: int = Field(default=1, env="INGEST_MAX_CONCURRENT_JOBS")
+    ingest_max_queued_jobs: int = Field(default=16, env="INGEST_MAX_QUEUED_JOBS")
+    ingest_job_history: int = Field(default=100, env="INGEST_JOB_HISTORY")
+
+    # Parsing backend: "thread" runs loaders in the shared thread pool, "process" parses
+    # the extensions below in a process pool (0 workers = one per CPU core)
+    parser_backend: str = Field(default="thread", env="PARSER_BACKEND")
+    parser_workers: int = Field(default=0, env="PARSER_WORKERS")
+    process_parse_extensions: List[str] = Field(default=[".pdf", ".docx"], env="PROCESS_PARSE_EXTENSIONS")
+
     # Supported file types
     supported_extensions: List[str] = Field(
         default=[".py", ".md", ".txt", ".json", ".yml", ".docx", ".pdf"],
@@ -38,15 +92,64 @@ class Settings(BaseSettings):
     documents_folder: str = Field(default="./documents", env="DOCUMENTS_FOLDER")
     auto_load_on_startup: bool = Field(default=True, env="AUTO_LOAD_ON_STARTUP")
 
+    # Folder watcher: re-index changed files in documents_folder as they change. Backend "auto"
+    # uses inotify (watchfiles) and falls back to polling, "poll" always polls. Bursts are
+    # debounced and at most watch_max_files_per_batch paths are indexed per batch interval
+    watch_enabled: bool = Field(default=False, env="WATCH_ENABLED")
+    watch_backend: str = Field(default="auto", env="WATCH_BACKEND")
+    watch_poll_interval_ms: int = Field(default=2000, env="WATCH_POLL_INTERVAL_MS")
+    watch_debounce_ms: int = Field(default=1000, env="WATCH_DEBOUNCE_MS")
+    watch_max_files_per_batch: int = Field(default=32, env="WATCH_MAX_FILES_PER_BATCH")
+    watch_min_batch_interval_seconds: float = Field(default=2.0, env="WATCH_MIN_BATCH_INTERVAL_SECONDS")
+
     # RAG Settings
     retrieval_k: int = Field(default=5, env="RETRIEVAL_K")
     similarity_threshold: float = Field(default=0.7, env="SIMILARITY_THRESHOLD")
+    context_token_budget: int = Field(default=3000, env="CONTEXT_TOKEN_BUDGET")
+
+    # Hybrid retrieval: BM25 lexical results fused with dense results (reciprocal rank fusion)
+    hybrid_search_enabled: bool = Field(default=False, env="HYBRID_SEARCH_ENABLED")
+    hybrid_candidates: int = Field(default=20, env="HYBRID_CANDIDATES")
+    rrf_k: int = Field(default=60, env="RRF_K")
+
+    # Optional cross-encoder rerank: over-fetch candidates, score them, keep the top retrieval_k
+    rerank_enabled: bool = Field(default=False, env="RERANK_ENABLED")
+    rerank_model: str = Field(default="cross-encoder/ms-marco-MiniLM-L-6-v2", env="RERANK_MODEL")
+    rerank_candidates: int = Field(default=20, env="RERANK_CANDIDATES")
+    rerank_cache_size: int = Field(default=10000, env="RERANK_CACHE_SIZE")
+
+    # Optional in-process brute-force vector index; Chroma answers above vector_index_max_chunks
+    vector_index_enabled: bool = Field(default=False, env="VECTOR_INDEX_ENABLED")
+    vector_index_max_chunks: int = Field(default=50000, env="VECTOR_INDEX_MAX_CHUNKS")
+    vector_index_dtype: str = Field(default="float32", env="VECTOR_INDEX_DTYPE")
+    vector_index_file: str = Field(default="vector_index.mmap", env="VECTOR_INDEX_FILE")
+
+    query_embedding_cache_size: int = Field(default=1024, env="QUERY_EMBEDDING_CACHE_SIZE")
+    query_embedding_cache_ttl_seconds: int = Field(default=3600, env="QUERY_EMBEDDING_CACHE_TTL_SECONDS")
+    query_batch_window_ms: float = Field(default=5.0, env="QUERY_BATCH_WINDOW_MS")
+    query_batch_max_size: int = Field(default=32, env="QUERY_BATCH_MAX_SIZE")
 
     # Chat Settings
     default_temperature: float = Field(default=0.7, env="DEFAULT_TEMPERATURE")
     default_max_tokens: int = Field(default=1000, env="DEFAULT_MAX_TOKENS")
     max_conversation_length: int = Field(default=10, env="MAX_CONVERSATION_LENGTH")
 
+    # Conversation history store ("memory" or "sqlite"), bounded by count and idle time
+    conversation_store: str = Field(default="memory", env="CONVERSATION_STORE")
+    conversation_store_file: str = Field(default="conversations.sqlite3", env="CONVERSATION_STORE_FILE")
+    conversation_max_count: int = Field(default=10000, env="CONVERSATION_MAX_COUNT")
+    conversation_ttl_seconds: int = Field(default=86400, env="CONVERSATION_TTL_SECONDS")
+
+    # History in the prompt: recent turns verbatim up to the token budget, older turns as a running summary
+    history_token_budget: int = Field(default=1500, env="HISTORY_TOKEN_BUDGET")
+    history_summary_enabled: bool = Field(default=True, env="HISTORY_SUMMARY_ENABLED")
+    history_summary_max_tokens: int = Field(default=300, env="HISTORY_SUMMARY_MAX_TOKENS")
+
+    # Semantic answer cache (first-turn questions only)
+    answer_cache_enabled: bool = Field(default=False, env="ANSWER_CACHE_ENABLED")
+    answer_cache_max_distance: float = Field(default=0.05, env="ANSWER_CACHE_MAX_DISTANCE")
+    answer_cache_size: int = Field(default=512, env="ANSWER_CACHE_SIZE")
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
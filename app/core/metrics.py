@@ -0,0 +1,90 @@
+"""
+Prometheus metrics for the chat and ingestion pipelines, served at GET /metrics.
+
+Label children are bound once at import time, so recording on the hot path is a single
+observe()/inc() call. With several workers (python -m app.serve) every process writes to
+PROMETHEUS_MULTIPROC_DIR and a scrape of any worker returns the aggregate.
+"""
+import os
+from typing import Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess
+)
+
+# Seconds; dense from 1 ms (cache hits, in-process search) up to slow LLM calls
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+STAGE_SECONDS = Histogram(
+    "rag_stage_seconds",
+    "Latency of one stage of the chat pipeline",
+    ["stage"],
+    buckets=LATENCY_BUCKETS
+)
+QUERY_EMBEDDING_SECONDS = STAGE_SECONDS.labels("query_embedding")
+CHROMA_QUERY_SECONDS = STAGE_SECONDS.labels("chroma_query")
+VECTOR_INDEX_QUERY_SECONDS = STAGE_SECONDS.labels("vector_index_query")
+LEXICAL_SEARCH_SECONDS = STAGE_SECONDS.labels("lexical_search")
+RERANK_SECONDS = STAGE_SECONDS.labels("rerank")
+CONTEXT_BUILD_SECONDS = STAGE_SECONDS.labels("context_build")
+LLM_CALL_SECONDS = STAGE_SECONDS.labels("llm")
+
+REQUEST_SECONDS = Histogram(
+    "rag_chat_request_seconds",
+    "End-to-end latency of a chat request",
+    ["endpoint"],
+    buckets=LATENCY_BUCKETS
+)
+CHAT_REQUEST_SECONDS = REQUEST_SECONDS.labels("chat")
+CHAT_STREAM_REQUEST_SECONDS = REQUEST_SECONDS.labels("chat_stream")
+
+LLM_TOKENS = Counter("rag_llm_tokens", "Tokens sent to and generated by the LLM", ["kind"])
+LLM_PROMPT_TOKENS = LLM_TOKENS.labels("prompt")
+LLM_COMPLETION_TOKENS = LLM_TOKENS.labels("completion")
+
+LLM_IN_FLIGHT = Gauge("rag_llm_in_flight", "LLM calls in progress", multiprocess_mode="livesum")
+
+CACHE_REQUESTS = Counter("rag_cache_requests", "Cache lookups by cache and outcome", ["cache", "result"])
+QUERY_EMBEDDING_CACHE_HITS = CACHE_REQUESTS.labels("query_embedding", "hit")
+QUERY_EMBEDDING_CACHE_MISSES = CACHE_REQUESTS.labels("query_embedding", "miss")
+EMBEDDING_CACHE_HITS = CACHE_REQUESTS.labels("embedding", "hit")
+EMBEDDING_CACHE_MISSES = CACHE_REQUESTS.labels("embedding", "miss")
+ANSWER_CACHE_HITS = CACHE_REQUESTS.labels("answer", "hit")
+ANSWER_CACHE_MISSES = CACHE_REQUESTS.labels("answer", "miss")
+
+# Ingestion throughput is rate() over these counters
+INGEST_FILES = Counter("rag_ingest_files", "Files handled by ingestion", ["result"])
+INGEST_FILES_ADDED = INGEST_FILES.labels("added")
+INGEST_FILES_UPDATED = INGEST_FILES.labels("updated")
+INGEST_FILES_DELETED = INGEST_FILES.labels("deleted")
+INGEST_FILES_FAILED = INGEST_FILES.labels("failed")
+INGEST_CHUNKS = Counter("rag_ingest_chunks", "Chunks embedded and written by ingestion")
+
+EXECUTOR_QUEUE_DEPTH = Gauge(
+    "rag_executor_queue_depth",
+    "Tasks waiting for a thread in a worker pool",
+    ["executor"],
+    multiprocess_mode="livesum"
+)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Exposition body and content type, aggregated over worker processes in multiprocess mode"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead():
+    """Drop this worker's live gauges from the multiprocess aggregate on shutdown"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,88 @@
+"""
+Embedding sidecar: loads the embedding model once and serves it to every API worker
+(EMBEDDING_BACKEND=remote). Single-text requests from concurrent workers are coalesced
+by the same micro-batcher the API uses for query embeddings.
+
+    python -m app.embedding_server --port 8001
+"""
+import argparse
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+from fastapi import FastAPI
+from pydantic import BaseModel
+
+from app.core.config import get_settings
+from app.services.embedders import Embedder, build_embedder, encode_vectors
+from app.services.embedding_batcher import QueryEmbeddingBatcher
+
+logger = logging.getLogger(__name__)
+
+embedder: Optional[Embedder] = None
+batcher: Optional[QueryEmbeddingBatcher] = None
+executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="embed")
+
+
+class EmbedRequest(BaseModel):
+    texts: List[str]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global embedder, batcher
+
+    settings = get_settings()
+    if settings.embedding_backend.lower() == "remote":
+        raise RuntimeError("The embedding server needs a local backend, not EMBEDDING_BACKEND=remote")
+
+    embedder = build_embedder(settings)
+    batcher = QueryEmbeddingBatcher(
+        embed_fn=embedder.embed_documents,
+        executor=executor,
+        window_ms=settings.query_batch_window_ms,
+        max_batch_size=settings.query_batch_max_size
+    )
+    logger.info(f"Embedding server ready ({embedder.cache_key})")
+    yield
+    executor.shutdown(wait=True)
+
+
+app = FastAPI(title="Embedding sidecar", lifespan=lifespan)
+
+
+@app.get("/info")
+async def info():
+    """Model identity, used by clients to key their caches"""
+    return {"model": embedder.model_name, "backend": embedder.backend, "cache_key": embedder.cache_key}
+
+
+@app.get("/stats")
+async def stats():
+    return {"batching": batcher.stats()}
+
+
+@app.post("/embed")
+async def embed(request: EmbedRequest):
+    """Embed texts; returns base64 float32 vectors (see encode_vectors)"""
+    if len(request.texts) == 1:
+        # Queries: batched with the queries other workers are sending right now
+        vectors = [await batcher.embed(request.texts[0])]
+    else:
+        loop = asyncio.get_running_loop()
+        vectors = await loop.run_in_executor(executor, embedder.embed_documents, request.texts)
+    return encode_vectors(vectors)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
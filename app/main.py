@@ -1,7 +1,13 @@
+import asyncio
+import time
+
+# Reference point for the startup timings reported by /health and /ready
+_process_started = time.perf_counter()
+
 import warnings
 import logging
 from fastapi import FastAPI, HTTPException, Depends, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 from contextlib import asynccontextmanager
@@ -16,79 +22,148 @@ warnings.filterwarnings("ignore", category=UserWarning, message=".*capture.*")
 logging.getLogger("chromadb").setLevel(logging.ERROR)
 logging.getLogger("chromadb.telemetry").setLevel(logging.ERROR)
 
+from app.core import metrics
 from app.core.config import get_settings
 from app.services.document_service import DocumentService
 from app.services.chat_service import ChatService
+from app.services.folder_watcher import FolderWatcher
+from app.services.ingestion_jobs import IngestionJob, IngestionJobManager, JobQueueFullError
 from app.models.schemas import (
     ChatRequest,
     ChatResponse,
     DocumentUploadRequest,
     DocumentUploadResponse,
-    HealthResponse
+    HealthResponse,
+    IngestionJobResponse
 )
 
 # Global service instances
 document_service: Optional[DocumentService] = None
 chat_service: Optional[ChatService] = None
+job_manager: Optional[IngestionJobManager] = None
+folder_watcher: Optional[FolderWatcher] = None
 
+# Startup progress reported by /ready (the port opens before services are initialized)
+startup_state: Dict[str, Any] = {
+    "ready": False,
+    "phase": "starting",
+    "model_loaded": False,
+    "indexing": "pending",
+    "error": None,
+    "time_to_first_health_ms": None,
+    "model_load_ms": None,
+    "ready_ms": None
+}
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Initialize services on startup and cleanup on shutdown"""
-    global document_service, chat_service
 
-    document_service = None
-    chat_service = None
+def _elapsed_ms() -> float:
+    return round((time.perf_counter() - _process_started) * 1000, 1)
 
-    try:
-        settings = get_settings()
 
-        # Initialize services
-        try:
-            print("🔄 Initializing document service...")
-            document_service = DocumentService(settings)
-            print("✅ Document service initialized")
-        except Exception as e:
-            print(f"❌ Failed to initialize document service: {str(e)}")
-            raise
+async def initialize_services(settings):
+    """Load the model and services off the event loop, then run the initial indexing"""
+    global document_service, chat_service, job_manager, folder_watcher
 
-        try:
-            print("🔄 Initializing chat service...")
-            chat_service = ChatService(settings, document_service)
-            print("✅ Chat service initialized")
-        except Exception as e:
-            print(f"❌ Failed to initialize chat service: {str(e)}")
-            raise
-
-        # Auto-load documents if enabled
-        if settings.auto_load_on_startup:
-            print("🔄 Auto-loading documents from 'documents' folder...")
-            try:
-                result = await document_service.auto_load_documents()
-                if result["processed_files"] > 0:
-                    print(f"✅ Auto-loaded {result['processed_files']} files, {result['total_chunks']} chunks")
-                else:
-                    print("ℹ️ No documents found to auto-load")
-            except Exception as e:
-                print(f"⚠️ Warning: Error auto-loading documents: {str(e)}")
-                print("⚠️ Continuing startup without auto-loaded documents...")
-
-        print("🚀 RAG Chatbot API initialized successfully")
+    try:
+        startup_state["phase"] = "loading_model"
+        print("🔄 Initializing document service...")
+        # Model and Chroma loading block, so they run in a thread while /health is served
+        document_service = await asyncio.to_thread(DocumentService, settings)
+        startup_state["model_loaded"] = True
+        startup_state["model_load_ms"] = _elapsed_ms()
+        print(f"✅ Document service initialized ({startup_state['model_load_ms']:.0f} ms after start)")
+
+        job_manager = IngestionJobManager(
+            document_service,
+            max_concurrent=settings.ingest_max_concurrent_jobs,
+            max_queued=settings.ingest_max_queued_jobs,
+            history=settings.ingest_job_history
+        )
+
+        startup_state["phase"] = "initializing_chat"
+        print("🔄 Initializing chat service...")
+        chat_service = ChatService(settings, document_service)
+        print("✅ Chat service initialized")
     except Exception as e:
+        startup_state.update({"phase": "failed", "error": str(e)})
         print(f"❌ Fatal error during startup: {str(e)}")
         import traceback
         traceback.print_exc()
-        # Re-raise to prevent the app from starting in an invalid state
-        # But wrap it to provide better error context
-        raise RuntimeError(f"Failed to initialize application: {str(e)}") from e
+        return
+
+    # Watch the documents folder (leader only); started first so no change during the initial load is missed
+    if settings.watch_enabled and Path(settings.documents_folder).exists():
+        if document_service.coordinator.try_become_leader():
+            folder_watcher = FolderWatcher(
+                settings.documents_folder,
+                job_manager,
+                supported_extensions=settings.supported_extensions,
+                backend=settings.watch_backend,
+                poll_interval_ms=settings.watch_poll_interval_ms,
+                debounce_ms=settings.watch_debounce_ms,
+                max_files_per_batch=settings.watch_max_files_per_batch,
+                min_batch_interval_seconds=settings.watch_min_batch_interval_seconds
+            )
+            folder_watcher.start()
+            print(f"👀 Watching {settings.documents_folder} for changes")
+
+    # Auto-load documents if enabled; with several workers only the ingestion leader does it
+    startup_state["phase"] = "indexing"
+    if not settings.auto_load_on_startup:
+        startup_state["indexing"] = "disabled"
+    elif not document_service.coordinator.try_become_leader():
+        startup_state["indexing"] = "skipped"
+        print("ℹ️ Another worker is the ingestion leader; serving the shared index")
+    else:
+        startup_state["indexing"] = "running"
+        print("🔄 Auto-loading documents from 'documents' folder in the background...")
+        try:
+            result = await document_service.auto_load_documents()
+            startup_state["indexing"] = "done"
+            if result["processed_files"] > 0:
+                print(f"✅ Auto-loaded {result['processed_files']} files, {result['total_chunks']} chunks")
+            elif result["unchanged_files"] > 0:
+                print(f"✅ Index is up to date ({result['unchanged_files']} files unchanged)")
+            else:
+                print("ℹ️ No documents found to auto-load")
+        except Exception as e:
+            startup_state.update({"indexing": "failed", "error": str(e)})
+            print(f"⚠️ Warning: Error auto-loading documents: {str(e)}")
+            print("⚠️ Continuing without auto-loaded documents...")
+
+    startup_state.update({"ready": True, "phase": "ready", "ready_ms": _elapsed_ms()})
+    print(f"🚀 RAG Chatbot API ready ({startup_state['ready_ms']:.0f} ms after start)")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the port right away; initialize services and index in the background"""
+    global document_service, chat_service, job_manager, folder_watcher
+
+    document_service = None
+    chat_service = None
+    job_manager = None
+    folder_watcher = None
+
+    init_task = asyncio.create_task(initialize_services(get_settings()))
 
     try:
         yield  # --- app runs here ---
     finally:
+        init_task.cancel()
+        await asyncio.gather(init_task, return_exceptions=True)
+
         # Cleanup
         try:
+            if folder_watcher:
+                await folder_watcher.stop()
+            if job_manager:
+                await job_manager.shutdown()
+            if chat_service:
+                await chat_service.cleanup()
             if document_service:
                 await document_service.cleanup()
+            metrics.mark_process_dead()
             print("🛑 RAG Chatbot API shutdown complete")
         except Exception as e:
             print(f"⚠️ Error during cleanup: {str(e)}")
@@ -134,6 +209,40 @@ def get_chat_service() -> ChatService:
     return chat_service
 
 
+def get_job_manager() -> IngestionJobManager:
+    """Dependency to get the ingestion job manager"""
+    if job_manager is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Document service not initialized"
+        )
+    return job_manager
+
+
+def _upload_response(result: Dict[str, Any], message: str) -> DocumentUploadResponse:
+    return DocumentUploadResponse(
+        success=True,
+        message=message,
+        processed_files=result["processed_files"],
+        total_chunks=result["total_chunks"],
+        details=result.get("details", []),
+        added_files=result["added_files"],
+        updated_files=result["updated_files"],
+        deleted_files=result["deleted_files"],
+        unchanged_files=result["unchanged_files"]
+    )
+
+
+async def _wait_for_job(manager: IngestionJobManager, job: IngestionJob) -> Dict[str, Any]:
+    """Block the request until the job is done (the job still counts against the concurrency cap)"""
+    await manager.wait(job)
+    if job.status == "cancelled":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Ingestion job {job.id} was cancelled")
+    if job.status == "failed":
+        raise RuntimeError(job.error)
+    return job.result
+
+
 @app.get("/", response_model=HealthResponse)
 async def root():
     """Root endpoint with API information"""
@@ -146,7 +255,10 @@ async def root():
 
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
-    """Health check endpoint"""
+    """Liveness: the process is up and serving (see /ready for model and indexing state)"""
+    if startup_state["time_to_first_health_ms"] is None:
+        startup_state["time_to_first_health_ms"] = _elapsed_ms()
+        print(f"✅ First healthy response {startup_state['time_to_first_health_ms']:.0f} ms after start")
     return HealthResponse(
         status="healthy",
         message="All services are operational",
@@ -154,29 +266,55 @@ async def health_check():
     )
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness: 200 once the model is loaded and the initial indexing has finished, 503 before"""
+    content = {
+        **startup_state,
+        "indexing_progress": document_service.sync_progress if document_service else None
+    }
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if startup_state["ready"] else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=content
+    )
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus metrics: per-stage latency histograms, token, cache and ingestion counters"""
+    if document_service is not None:
+        document_service.record_executor_queues()
+    body, content_type = metrics.render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 @app.post("/documents/refresh", response_model=DocumentUploadResponse)
 async def refresh_documents(
-    service: DocumentService = Depends(get_document_service)
+    rebuild: bool = False,
+    manager: IngestionJobManager = Depends(get_job_manager)
 ):
     """
-    Refresh documents by re-loading from the default documents folder.
-    This will clear existing documents and reload everything.
+    Refresh documents from the default documents folder and wait for the result.
+    Only added or changed files are re-embedded; chunks of removed files are deleted.
+    With `rebuild=true` everything is re-indexed into a new collection version that
+    replaces the current one when complete; queries keep using the current one until then.
+    Use POST /documents/jobs/refresh to run it in the background instead.
     """
     try:
-        # Clear existing documents first
-        await service.clear_database()
-
-        # Auto-load documents again
-        result = await service.auto_load_documents()
+        result = await _wait_for_job(manager, manager.submit_refresh(rebuild=rebuild))
 
-        return DocumentUploadResponse(
-            success=True,
-            message=f"Successfully refreshed {result['processed_files']} documents",
-            processed_files=result["processed_files"],
-            total_chunks=result["total_chunks"],
-            details=result.get("details", [])
+        return _upload_response(
+            result,
+            f"Refreshed documents: {result['added_files']} added, {result['updated_files']} updated, "
+            f"{result['deleted_files']} deleted, {result['unchanged_files']} unchanged"
         )
 
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e))
+
+    except HTTPException:
+        raise
+
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -238,22 +376,17 @@ async def get_documents_folder_info(
 @app.post("/documents/upload", response_model=DocumentUploadResponse)
 async def upload_documents(
     request: DocumentUploadRequest,
-    service: DocumentService = Depends(get_document_service)
+    manager: IngestionJobManager = Depends(get_job_manager)
 ):
-    """Upload and process documents from a specified folder"""
+    """
+    Upload and process documents from a specified folder and wait for the result.
+    Use POST /documents/jobs/upload to run it in the background instead.
+    """
     try:
-        result = await service.process_documents(
-            folder_path=request.folder_path,
-            file_patterns=request.file_patterns
-        )
+        job = manager.submit_folder(request.folder_path, request.file_patterns)
+        result = await _wait_for_job(manager, job)
 
-        return DocumentUploadResponse(
-            success=True,
-            message=f"Processed {result['processed_files']} files successfully.",
-            processed_files=result["processed_files"],
-            total_chunks=result["total_chunks"],
-            details=result.get("details", [])
-        )
+        return _upload_response(result, f"Processed {result['processed_files']} files successfully.")
 
     except ValueError as e:
         raise HTTPException(
@@ -261,6 +394,12 @@ async def upload_documents(
             detail=str(e)
         )
 
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e))
+
+    except HTTPException:
+        raise
+
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -268,6 +407,66 @@ async def upload_documents(
         )
 
 
+@app.post("/documents/jobs/refresh", response_model=IngestionJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_refresh_job(
+    rebuild: bool = False,
+    manager: IngestionJobManager = Depends(get_job_manager)
+):
+    """Start refreshing (or with `rebuild=true` fully re-indexing) the default documents folder in the background"""
+    try:
+        return manager.submit_refresh(rebuild=rebuild).to_dict()
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e))
+
+
+@app.post("/documents/jobs/upload", response_model=IngestionJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_upload_job(
+    request: DocumentUploadRequest,
+    manager: IngestionJobManager = Depends(get_job_manager)
+):
+    """Start processing a folder in the background; poll the returned job"""
+    try:
+        return manager.submit_folder(request.folder_path, request.file_patterns).to_dict()
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e))
+
+
+@app.get("/documents/jobs", response_model=List[IngestionJobResponse])
+async def list_jobs(
+    manager: IngestionJobManager = Depends(get_job_manager)
+):
+    """Running, queued and recently finished ingestion jobs, newest first"""
+    return [job.to_dict() for job in manager.list_jobs()]
+
+
+@app.get("/documents/jobs/{job_id}", response_model=IngestionJobResponse)
+async def get_job(
+    job_id: str,
+    manager: IngestionJobManager = Depends(get_job_manager)
+):
+    """Progress of an ingestion job: file and chunk counters, throughput and ETA"""
+    job = manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job not found on this worker: {job_id}")
+    return job.to_dict()
+
+
+@app.delete("/documents/jobs/{job_id}", response_model=IngestionJobResponse)
+async def cancel_job(
+    job_id: str,
+    manager: IngestionJobManager = Depends(get_job_manager)
+):
+    """Cancel a queued or running ingestion job (finished jobs are returned unchanged)"""
+    job = manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job not found on this worker: {job_id}")
+    # Give the pipeline a moment to unwind so the response shows the final state
+    await manager.wait(job, timeout=2.0)
+    return job.to_dict()
+
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
@@ -299,6 +498,28 @@ async def chat(
         )
 
 
+@app.post("/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    chat_service: ChatService = Depends(get_chat_service)
+):
+    """
+    Chat with the RAG system and stream the answer as Server-Sent Events.
+    Events: `sources` (retrieved documents), `token` (answer chunks), `done` (metadata
+    including time-to-first-token) or `error`.
+    """
+    return StreamingResponse(
+        chat_service.chat_stream(
+            message=request.message,
+            conversation_id=request.conversation_id,
+            max_tokens=request.max_tokens,
+            temperature=request.temperature
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.get("/documents/status")
 async def get_document_status(
     service: DocumentService = Depends(get_document_service)
@@ -306,6 +527,9 @@ async def get_document_status(
     """Get the status of the document database"""
     try:
         status_info = await service.get_status()
+        if job_manager:
+            status_info["ingestion_jobs"] = job_manager.stats()
+        status_info["folder_watcher"] = folder_watcher.stats() if folder_watcher else None
         return JSONResponse(content=status_info)
     except Exception as e:
         raise HTTPException(
@@ -34,7 +34,54 @@ class DocumentUploadResponse(BaseModel):
     message: str
     processed_files: int
     total_chunks: int
-    details: Optional[List[Dict[str, Any]]] = None
+    details: Optional[List[str]] = None
+    added_files: Optional[int] = None
+    updated_files: Optional[int] = None
+    deleted_files: Optional[int] = None
+    unchanged_files: Optional[int] = None
+
+
+# ------------------------------
+# Ingestion Jobs
+# ------------------------------
+class IngestionJobStatus(str, Enum):
+    """Lifecycle of an ingestion job"""
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+    cancelled = "cancelled"
+
+
+class IngestionJobResponse(BaseModel):
+    """Status and progress of an ingestion job"""
+    id: str
+    kind: str = Field(
+        ...,
+        description="'refresh' (default documents folder), 'rebuild' (full re-index), 'folder' or 'paths' (folder watcher)"
+    )
+    folder: Optional[str] = None
+    status: IngestionJobStatus
+    phase: str = Field(..., description="Pipeline phase: queued, waiting, discovering, running, done, ...")
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    files_discovered: int = 0
+    files_unchanged: int = 0
+    files_to_process: int = 0
+    files_parsed: int = 0
+    files_embedded: int = 0
+    files_added: int = 0
+    files_failed: int = 0
+    files_deleted: int = 0
+    chunks_embedded: int = 0
+    chunks_added: int = 0
+    elapsed_seconds: Optional[float] = None
+    files_per_second: Optional[float] = None
+    chunks_per_second: Optional[float] = None
+    eta_seconds: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
 
 
 # ------------------------------
@@ -0,0 +1,90 @@
+"""
+Production serving mode: N uvicorn workers sharing one embedding sidecar.
+
+- The embedding model is loaded once, in the sidecar, instead of once per worker.
+- Exactly one worker (the holder of the ingestion leader lock) runs startup ingestion;
+  index writes from any worker are serialized by a cross-process write lock and published
+  as a new index generation that the other workers reload.
+- Conversations go to the SQLite store so every worker sees the same history.
+- Prometheus metrics are written to a shared directory so /metrics on any worker reports
+  the totals of all of them.
+
+    python -m app.serve --workers 4 --port 8000
+"""
+import argparse
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def start_embedding_server(host: str, port: int, wait_seconds: float = 300.0) -> subprocess.Popen:
+    """Run the embedding sidecar and wait until its model is loaded"""
+    import httpx
+
+    process = subprocess.Popen([sys.executable, "-m", "app.embedding_server", "--host", host, "--port", str(port)])
+    deadline = time.time() + wait_seconds
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Embedding server exited with code {process.returncode}")
+        try:
+            httpx.get(f"http://{host}:{port}/info", timeout=1).raise_for_status()
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError("Embedding server did not start")
+
+
+def main(args: argparse.Namespace):
+    import uvicorn
+
+    from app.core.config import get_settings
+
+    settings = get_settings()
+    sidecar = None
+    metrics_dir = None
+
+    if args.workers > 1:
+        if settings.embedding_backend.lower() != "remote":
+            sidecar = start_embedding_server(args.embedding_host, args.embedding_port)
+            # Workers are spawned after this, so they inherit the remote configuration
+            os.environ["EMBEDDING_BACKEND"] = "remote"
+            os.environ["EMBEDDING_SERVICE_URL"] = f"http://{args.embedding_host}:{args.embedding_port}"
+
+        if settings.conversation_store.lower() == "memory":
+            logger.warning("Per-worker memory conversation store would split history; using SQLite")
+            os.environ["CONVERSATION_STORE"] = "sqlite"
+
+        if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+            metrics_dir = tempfile.mkdtemp(prefix="rag-metrics-")
+            os.environ["PROMETHEUS_MULTIPROC_DIR"] = metrics_dir
+
+    try:
+        uvicorn.run("app.main:app", host=args.host, port=args.port, workers=args.workers)
+    finally:
+        if sidecar is not None:
+            sidecar.terminate()
+            sidecar.wait(timeout=30)
+        if metrics_dir is not None:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", 1)))
+    parser.add_argument("--embedding-host", default="127.0.0.1")
+    parser.add_argument("--embedding-port", type=int, default=8001)
+    return parser
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main(build_parser().parse_args())
@@ -0,0 +1,104 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class AnswerCache:
+    """
+    Semantic cache of chat answers for first-turn questions.
+    An entry is reused when the new question retrieved exactly the same chunks and its
+    embedding is within `max_distance` (cosine distance) of the cached question.
+    Entries are tied to the document index version and dropped as soon as it changes.
+    """
+
+    def __init__(self, max_entries: int = 512, max_distance: float = 0.05):
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self.hits = 0
+        self.misses = 0
+
+        # retrieval key -> list of (normalized question embedding, answer, sources)
+        self._entries: "OrderedDict[Tuple[str, ...], List[Tuple[np.ndarray, str, List[Dict[str, Any]]]]]" = OrderedDict()
+        self._size = 0
+        self._index_version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def lookup(
+        self,
+        embedding: Sequence[float],
+        chunk_ids: Sequence[str],
+        index_version: int
+    ) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+        """Return (answer, sources) for a close enough question, or None"""
+        query = _normalize(embedding)
+        key = tuple(sorted(chunk_ids))
+
+        with self._lock:
+            self._check_version(index_version)
+            candidates = self._entries.get(key)
+            if candidates:
+                for cached_embedding, answer, sources in candidates:
+                    if 1.0 - float(np.dot(query, cached_embedding)) <= self.max_distance:
+                        self._entries.move_to_end(key)
+                        self.hits += 1
+                        return answer, sources
+            self.misses += 1
+            return None
+
+    def store(
+        self,
+        embedding: Sequence[float],
+        chunk_ids: Sequence[str],
+        index_version: int,
+        answer: str,
+        sources: List[Dict[str, Any]]
+    ):
+        """Cache an answer for a question and its retrieval set"""
+        if self.max_entries <= 0 or not chunk_ids:
+            return
+
+        key = tuple(sorted(chunk_ids))
+        with self._lock:
+            # Generated against an index that changed meanwhile; only lookups move the version forward
+            if index_version != self._index_version:
+                return
+            self._entries.setdefault(key, []).append((_normalize(embedding), answer, sources))
+            self._entries.move_to_end(key)
+            self._size += 1
+
+            while self._size > self.max_entries and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self):
+        """Drop every cached answer"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _check_version(self, index_version: int):
+        # Any change to the indexed chunks invalidates every answer
+        if index_version != self._index_version:
+            self._entries.clear()
+            self._size = 0
+            self._index_version = index_version
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and hit/miss counters"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": self._size,
+            "max_entries": self.max_entries,
+            "max_distance": self.max_distance,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+def _normalize(embedding: Sequence[float]) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
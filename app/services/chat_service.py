@@ -1,6 +1,13 @@
+import asyncio
+import functools
+import json
+import random
+import time
 import uuid
 import logging
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
 from datetime import datetime
 
 try:
@@ -9,6 +16,8 @@ except ImportError:
     from langchain_openai import ChatOpenAI
     AzureChatOpenAI = None
 from langchain.schema import SystemMessage, HumanMessage, AIMessage
+import httpx
+import openai
 
 # Import OpenAI exceptions (v1.x structure)
 try:
@@ -24,7 +33,11 @@ except ImportError:
         AuthenticationError = ValueError
         RateLimitError = Exception
 
+from app.core import metrics
 from app.core.config import Settings
+from app.services.answer_cache import AnswerCache
+from app.services.context_packer import TOKENS_PER_MESSAGE, ContextPacker
+from app.services.conversation_store import ConversationStore, build_conversation_store
 from app.services.document_service import DocumentService
 
 import os
@@ -97,9 +110,45 @@ class ChatService:
                 logger.error(f"Failed to initialize ChatOpenAI: {str(e)}")
                 raise ValueError(f"Failed to initialize ChatOpenAI: {str(e)}. Please check your OpenAI configuration.")
 
-        # Store conversations in memory
-        # (In production, this should be replaced with a database)
-        self.conversations: Dict[str, List[Dict[str, Any]]] = {}
+        # One pooled keep-alive HTTP client for all LLM calls. Retries are handled here
+        # (with jittered backoff), so the OpenAI client itself does not retry.
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.llm_max_connections,
+                max_keepalive_connections=settings.llm_max_connections,
+                keepalive_expiry=settings.llm_keepalive_seconds
+            ),
+            timeout=httpx.Timeout(settings.llm_timeout_seconds)
+        )
+        self.llm.async_client = self._build_async_client().chat.completions
+
+        # Cap on in-flight LLM calls
+        self._llm_semaphore = asyncio.Semaphore(settings.llm_max_concurrency)
+        self.llm_in_flight = 0
+
+        # Bounded conversation history (in memory or SQLite)
+        self.conversations: ConversationStore = build_conversation_store(settings)
+        # Store calls may block on SQLite (and its file lock across workers), so they run off the
+        # event loop; one thread is enough since the store serializes on a single connection
+        self.conversation_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="conversations")
+
+        # Background tasks folding older turns into each conversation's running summary
+        self._summary_tasks: Dict[str, asyncio.Task] = {}
+
+        # Packs retrieved chunks into the prompt under a token budget
+        self.context_packer = ContextPacker(
+            model=settings.openai_model,
+            token_budget=settings.context_token_budget,
+            max_overlap=settings.chunk_overlap
+        )
+
+        # Optional semantic cache of first-turn answers
+        self.answer_cache: Optional[AnswerCache] = None
+        if settings.answer_cache_enabled:
+            self.answer_cache = AnswerCache(
+                max_entries=settings.answer_cache_size,
+                max_distance=settings.answer_cache_max_distance
+            )
 
     async def chat(
         self,
@@ -109,6 +158,8 @@ class ChatService:
         temperature: Optional[float] = None
     ) -> Dict[str, Any]:
         """Handle chat interaction with RAG."""
+        start = time.perf_counter()
+
         # Generate conversation ID if not provided
         if conversation_id is None:
             conversation_id = str(uuid.uuid4())
@@ -118,36 +169,29 @@ class ChatService:
         temperature = temperature or self.settings.default_temperature
 
         try:
-            # Search for relevant documents
-            similar_docs = await self.document_service.search_similar_documents(
-                query=message,
-                k=self.settings.retrieval_k
+            first_turn = not await self._conversation_call(self.conversations.get, conversation_id)
+            index_version = self.document_service.index_version
+            similar_docs, query_embedding, messages, retrieval_stats, prompt_stats = await self._prepare_messages(
+                message, conversation_id
             )
 
-            # Build context from retrieved documents
-            context = self.build_context(similar_docs)
-
-            # Get conversation history
-            conversation_history = self.conversations.get(conversation_id, [])
-
-            # Create prompt with context and history
-            system_prompt = self._create_system_prompt(context)
-            messages = self._build_messages(system_prompt, conversation_history, message)
+            cached = await self._lookup_cached_answer(query_embedding, similar_docs, first_turn)
+            if cached is not None:
+                ai_response, sources = cached
+            else:
+                # Generate response with request-scoped parameters
+                ai_response = await self._generate(messages, temperature, max_tokens, prompt_stats["prompt_tokens"])
 
-            # Update LLM parameters
-            self.llm.temperature = temperature
-            self.llm.max_tokens = max_tokens
+                # Prepare sources information
+                sources = self._format_sources(similar_docs)
 
-            # Generate response
-            response = await self.llm.agenerate([messages])
-            ai_response = response.generations[0][0].text
+                if first_turn:
+                    await self._store_cached_answer(query_embedding, similar_docs, index_version, ai_response, sources)
 
             # Update conversation history
-            self._update_conversation(conversation_id, message, ai_response)
-
-            # Prepare sources information
-            sources = self._format_sources(similar_docs)
+            await self._update_conversation(conversation_id, message, ai_response)
 
+            metrics.CHAT_REQUEST_SECONDS.observe(time.perf_counter() - start)
             return {
                 "answer": ai_response,
                 "conversation_id": conversation_id,
@@ -157,43 +201,402 @@ class ChatService:
                     "timestamp": datetime.now().isoformat(),
                     "model": self.settings.openai_model,
                     "temperature": temperature,
-                    "max_tokens": max_tokens
+                    "max_tokens": max_tokens,
+                    "retrieval": retrieval_stats,
+                    **prompt_stats,
+                    "answer_cache_hit": cached is not None
                 }
             }
 
-        except (APIConnectionError, ConnectionError) as e:
+        except Exception as e:
+            raise self._map_exception(e) from e
+
+    async def chat_stream(
+        self,
+        message: str,
+        conversation_id: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """
+        Handle chat interaction with RAG as Server-Sent Events.
+        Emits a `sources` event, then one `token` event per LLM chunk, then a `done`
+        event with metadata. History is only updated once the stream completes.
+        """
+        start = time.perf_counter()
+
+        if conversation_id is None:
+            conversation_id = str(uuid.uuid4())
+
+        max_tokens = max_tokens or self.settings.default_max_tokens
+        temperature = temperature or self.settings.default_temperature
+
+        try:
+            first_turn = not await self._conversation_call(self.conversations.get, conversation_id)
+            index_version = self.document_service.index_version
+            similar_docs, query_embedding, messages, retrieval_stats, prompt_stats = await self._prepare_messages(
+                message, conversation_id
+            )
+            cached = await self._lookup_cached_answer(query_embedding, similar_docs, first_turn)
+            sources = cached[1] if cached is not None else self._format_sources(similar_docs)
+
+            yield _sse_event("sources", {
+                "conversation_id": conversation_id,
+                "sources": sources
+            })
+
+            time_to_first_token_ms = None
+            if cached is not None:
+                # The whole cached answer goes out as a single token event
+                ai_response = cached[0]
+                time_to_first_token_ms = round((time.perf_counter() - start) * 1000, 2)
+                yield _sse_event("token", {"token": ai_response})
+            else:
+                answer_parts: List[str] = []
+                async for token in self._stream(messages, temperature, max_tokens):
+                    if time_to_first_token_ms is None:
+                        time_to_first_token_ms = round((time.perf_counter() - start) * 1000, 2)
+                    answer_parts.append(token)
+                    yield _sse_event("token", {"token": token})
+
+                ai_response = "".join(answer_parts)
+                # Streamed responses carry no usage block, so both sides are counted locally
+                metrics.LLM_PROMPT_TOKENS.inc(prompt_stats["prompt_tokens"])
+                metrics.LLM_COMPLETION_TOKENS.inc(self.context_packer.count_tokens(ai_response))
+                if first_turn:
+                    await self._store_cached_answer(query_embedding, similar_docs, index_version, ai_response, sources)
+
+            await self._update_conversation(conversation_id, message, ai_response)
+
+            total_seconds = time.perf_counter() - start
+            metrics.CHAT_STREAM_REQUEST_SECONDS.observe(total_seconds)
+            yield _sse_event("done", {
+                "conversation_id": conversation_id,
+                "metadata": {
+                    "retrieved_documents": len(similar_docs),
+                    "timestamp": datetime.now().isoformat(),
+                    "model": self.settings.openai_model,
+                    "temperature": temperature,
+                    "max_tokens": max_tokens,
+                    "retrieval": retrieval_stats,
+                    **prompt_stats,
+                    "answer_cache_hit": cached is not None,
+                    "time_to_first_token_ms": time_to_first_token_ms,
+                    "total_ms": round(total_seconds * 1000, 2)
+                }
+            })
+
+        except Exception as e:
+            # Headers are already sent, so errors are reported in-band
+            mapped = self._map_exception(e)
+            yield _sse_event("error", {"conversation_id": conversation_id, "detail": str(mapped)})
+
+    def _build_async_client(self):
+        """Create the async OpenAI client on top of the shared connection pool."""
+        if self.settings.openai_base_url and self.settings.openai_api_type.lower() == "azure":
+            return openai.AsyncAzureOpenAI(
+                api_key=self.settings.openai_api_key,
+                azure_endpoint=self.settings.openai_base_url,
+                azure_deployment=self.settings.openai_model,
+                api_version=self.settings.openai_api_version,
+                http_client=self.http_client,
+                max_retries=0
+            )
+        return openai.AsyncOpenAI(
+            api_key=self.settings.openai_api_key,
+            base_url=self.settings.openai_base_url,
+            http_client=self.http_client,
+            max_retries=0
+        )
+
+    async def _generate(
+        self,
+        messages: List[Any],
+        temperature: float,
+        max_tokens: int,
+        prompt_tokens: Optional[int] = None
+    ) -> str:
+        """Call the LLM with per-request parameters, bounded concurrency and retry on rate limits."""
+        for attempt in range(self.settings.llm_max_retries + 1):
+            try:
+                async with self._llm_slot():
+                    response = await self.llm.agenerate(
+                        [messages],
+                        temperature=temperature,
+                        max_tokens=max_tokens
+                    )
+                text = response.generations[0][0].text
+                self._record_usage(response.llm_output, messages, prompt_tokens, text)
+                return text
+            except RateLimitError:
+                if attempt >= self.settings.llm_max_retries:
+                    raise
+                await self._backoff(attempt)
+
+    async def _stream(self, messages: List[Any], temperature: float, max_tokens: int) -> AsyncIterator[str]:
+        """Stream LLM tokens with per-request parameters; rate limits are retried until the first token."""
+        for attempt in range(self.settings.llm_max_retries + 1):
+            started = False
+            try:
+                async with self._llm_slot():
+                    async for chunk in self.llm.astream(messages, temperature=temperature, max_tokens=max_tokens):
+                        if chunk.content:
+                            started = True
+                            yield chunk.content
+                return
+            except RateLimitError:
+                if started or attempt >= self.settings.llm_max_retries:
+                    raise
+                await self._backoff(attempt)
+
+    @asynccontextmanager
+    async def _llm_slot(self):
+        """Hold one of the in-flight LLM call slots; the time spent in it is the LLM call latency."""
+        async with self._llm_semaphore:
+            self.llm_in_flight += 1
+            metrics.LLM_IN_FLIGHT.inc()
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                metrics.LLM_CALL_SECONDS.observe(time.perf_counter() - start)
+                metrics.LLM_IN_FLIGHT.dec()
+                self.llm_in_flight -= 1
+
+    def _record_usage(
+        self,
+        llm_output: Optional[Dict[str, Any]],
+        messages: List[Any],
+        prompt_tokens: Optional[int],
+        text: str
+    ):
+        """Count tokens from the provider's usage block, falling back to local counts."""
+        usage = (llm_output or {}).get("token_usage") or {}
+        if usage.get("prompt_tokens") is not None:
+            prompt_tokens = usage["prompt_tokens"]
+        elif prompt_tokens is None:
+            prompt_tokens = self.context_packer.count_message_tokens(messages)
+        completion_tokens = usage.get("completion_tokens")
+        if completion_tokens is None:
+            completion_tokens = self.context_packer.count_tokens(text)
+        metrics.LLM_PROMPT_TOKENS.inc(prompt_tokens)
+        metrics.LLM_COMPLETION_TOKENS.inc(completion_tokens)
+
+    async def _backoff(self, attempt: int):
+        """Sleep with exponential backoff and full jitter."""
+        delay = min(self.settings.llm_retry_max_delay, self.settings.llm_retry_base_delay * (2 ** attempt))
+        delay = random.uniform(0, delay)
+        logger.warning(f"LLM rate limited, retrying in {delay:.2f}s (attempt {attempt + 1})")
+        await asyncio.sleep(delay)
+
+    async def cleanup(self):
+        """Cancel pending summaries and close the pooled HTTP client and the conversation store."""
+        for task in list(self._summary_tasks.values()):
+            task.cancel()
+        await asyncio.gather(*self._summary_tasks.values(), return_exceptions=True)
+        await self.http_client.aclose()
+        self.conversation_executor.shutdown(wait=True)
+        self.conversations.close()
+
+    async def _conversation_call(self, fn, *args, **kwargs):
+        """Run a conversation store call on its own thread"""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self.conversation_executor, functools.partial(fn, *args, **kwargs))
+
+    async def _prepare_messages(
+        self,
+        message: str,
+        conversation_id: str
+    ) -> Tuple[List[Dict[str, Any]], List[float], List[Any], Dict[str, Any], Dict[str, Any]]:
+        """Retrieve relevant documents and build the LLM message list and its token counts."""
+        # Embed once; the answer cache reuses the vector instead of embedding the question again
+        retrieval_stats: Dict[str, Any] = {}
+        query_embedding = await self.document_service.embed_query(message, retrieval_stats)
+
+        # Search for relevant documents
+        similar_docs = await self.document_service.search_similar_documents(
+            query=message,
+            k=self.settings.retrieval_k,
+            stats=retrieval_stats,
+            query_embedding=query_embedding
+        )
+
+        # Build context from retrieved documents
+        start = time.perf_counter()
+        context, context_tokens = self._pack_context(similar_docs)
+        metrics.CONTEXT_BUILD_SECONDS.observe(time.perf_counter() - start)
+
+        # Get conversation history: recent turns verbatim, older ones through the summary
+        conversation_history = await self._conversation_call(self.conversations.get, conversation_id)
+        summary, summary_seq = await self._conversation_call(self.conversations.get_summary, conversation_id)
+        recent_history, history_stats = self._select_history(conversation_history, summary, summary_seq)
+
+        # Create prompt with context and history
+        system_prompt = self._create_system_prompt(context)
+        messages = self._build_messages(system_prompt, recent_history, message, summary)
+
+        prompt_stats = {
+            "context_tokens": context_tokens,
+            "prompt_tokens": self.context_packer.count_message_tokens(messages),
+            **history_stats
+        }
+        return similar_docs, query_embedding, messages, retrieval_stats, prompt_stats
+
+    def _select_history(
+        self,
+        history: List[Dict[str, Any]],
+        summary: str,
+        summary_seq: int = 0
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Pick the most recent whole turns that fit the history token budget next to the summary."""
+        max_history = self.settings.max_conversation_length
+        candidates = history[-max_history:] if len(history) > max_history else history
+        # Messages the summary already covers are never repeated verbatim
+        candidates = [msg for msg in candidates if msg["seq"] >= summary_seq]
+
+        def message_tokens(msg: Dict[str, Any]) -> int:
+            return self.context_packer.count_tokens(msg["content"]) + TOKENS_PER_MESSAGE
+
+        summary_tokens = self.context_packer.count_tokens(summary) + TOKENS_PER_MESSAGE if summary else 0
+        used = summary_tokens
+        start = len(candidates)
+        turn_tokens = 0
+
+        # Walk back one message at a time, committing at each user message (start of a turn)
+        for index in range(len(candidates) - 1, -1, -1):
+            turn_tokens += message_tokens(candidates[index])
+            if candidates[index]["role"] != "user":
+                continue
+            if used + turn_tokens > self.settings.history_token_budget:
+                break
+            used += turn_tokens
+            turn_tokens = 0
+            start = index
+
+        verbatim = candidates[start:]
+        uncompacted = sum(message_tokens(msg) for msg in candidates)
+        return verbatim, {
+            "history_tokens": used,
+            "history_summary_tokens": summary_tokens,
+            "history_messages": len(verbatim),
+            "history_tokens_saved": max(0, uncompacted - used)
+        }
+
+    def _schedule_summary(self, conversation_id: str):
+        """Fold turns that no longer fit the verbatim window into the summary, after the response."""
+        if not self.settings.history_summary_enabled:
+            return
+        task = self._summary_tasks.get(conversation_id)
+        if task is not None and not task.done():
+            # The running task picks up everything up to its start; the next turn catches the rest
+            return
+
+        task = asyncio.create_task(self._update_summary(conversation_id))
+        self._summary_tasks[conversation_id] = task
+        task.add_done_callback(lambda _: self._summary_tasks.pop(conversation_id, None))
+
+    async def _update_summary(self, conversation_id: str):
+        """Summarize messages outside the verbatim window that the summary does not cover yet."""
+        history = await self._conversation_call(self.conversations.get, conversation_id)
+        summary, summary_seq = await self._conversation_call(self.conversations.get_summary, conversation_id)
+        recent_history, _ = self._select_history(history, summary, summary_seq)
+
+        first_recent = recent_history[0]["seq"] if recent_history else None
+        pending = [
+            msg for msg in history
+            if msg["seq"] >= summary_seq and (first_recent is None or msg["seq"] < first_recent)
+        ]
+        if not pending:
+            return
+
+        transcript = "\n".join(f"{msg['role']}: {msg['content']}" for msg in pending)
+        messages = [
+            SystemMessage(content=(
+                "You maintain a running summary of a conversation between a developer and an onboarding "
+                "assistant. Merge the new messages into the summary. Keep facts, decisions, file names, "
+                "commands and open questions; drop pleasantries. Reply with the summary only."
+            )),
+            HumanMessage(content=f"Current summary:\n{summary or '(empty)'}\n\nNew messages:\n{transcript}")
+        ]
+
+        try:
+            new_summary = await self._generate(messages, 0.0, self.settings.history_summary_max_tokens)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Could not update summary for conversation {conversation_id}: {e}")
+            return
+
+        await self._conversation_call(
+            self.conversations.set_summary, conversation_id, new_summary.strip(), pending[-1]["seq"] + 1
+        )
+        logger.debug(f"Folded {len(pending)} messages into the summary of conversation {conversation_id}")
+
+    async def _lookup_cached_answer(
+        self,
+        query_embedding: List[float],
+        similar_docs: List[Dict[str, Any]],
+        first_turn: bool
+    ) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+        """Return a cached (answer, sources) for a near-duplicate first-turn question."""
+        if self.answer_cache is None or not first_turn or not similar_docs:
+            return None
+
+        cached = self.answer_cache.lookup(
+            query_embedding,
+            [doc["id"] for doc in similar_docs],
+            self.document_service.index_version
+        )
+        (metrics.ANSWER_CACHE_HITS if cached is not None else metrics.ANSWER_CACHE_MISSES).inc()
+        return cached
+
+    async def _store_cached_answer(
+        self,
+        query_embedding: List[float],
+        similar_docs: List[Dict[str, Any]],
+        index_version: int,
+        answer: str,
+        sources: List[Dict[str, Any]]
+    ):
+        """Remember a first-turn answer for the index version it was generated against."""
+        if self.answer_cache is None or not similar_docs:
+            return
+
+        self.answer_cache.store(query_embedding, [doc["id"] for doc in similar_docs], index_version, answer, sources)
+
+    def _map_exception(self, e: Exception) -> Exception:
+        """Translate OpenAI/LangChain errors into the exceptions the API reports."""
+        if isinstance(e, (APIConnectionError, ConnectionError)):
             error_msg = f"Connection error: Unable to connect to OpenAI/Azure endpoint. Please check your network connection and endpoint URL ({self.settings.openai_base_url or 'default'})."
             logger.error(f"{error_msg} Details: {str(e)}")
-            raise ConnectionError(error_msg) from e
-        except AuthenticationError as e:
+            return ConnectionError(error_msg)
+        if isinstance(e, AuthenticationError):
             error_msg = f"Authentication error: Invalid API key or credentials. Please check your OPENAI_API_KEY."
             logger.error(f"{error_msg} Details: {str(e)}")
-            raise ValueError(error_msg) from e
-        except RateLimitError as e:
+            return ValueError(error_msg)
+        if isinstance(e, RateLimitError):
             error_msg = f"Rate limit exceeded: Too many requests. Please try again later."
             logger.error(f"{error_msg} Details: {str(e)}")
-            raise ValueError(error_msg) from e
-        except APIError as e:
+            return ValueError(error_msg)
+        if isinstance(e, APIError):
             error_msg = f"API error: {str(e)}"
             logger.error(f"{error_msg} Details: {str(e)}")
-            raise RuntimeError(error_msg) from e
-        except Exception as e:
-            error_msg = f"Unexpected error during chat: {str(e)}"
-            logger.error(f"{error_msg}", exc_info=True)
-            raise RuntimeError(error_msg) from e
+            return RuntimeError(error_msg)
+        error_msg = f"Unexpected error during chat: {str(e)}"
+        logger.error(f"{error_msg}", exc_info=True)
+        return RuntimeError(error_msg)
 
     def build_context(self, similar_docs: List[Dict[str, Any]]) -> str:
         """Build context string from retrieved documents."""
-        if not similar_docs:
-            return "No relevant documents found."
+        context, _ = self._pack_context(similar_docs)
+        return context
 
-        context_parts = []
-        for i, doc in enumerate(similar_docs, 1):
-            source = doc["metadata"].get("source", "Unknown")
-            content = doc["content"][:500]  # limit content length
-            context_parts.append(f"Document {i} (from {source}):\n{content}\n")
+    def _pack_context(self, similar_docs: List[Dict[str, Any]]) -> Tuple[str, int]:
+        """Build the context string within the token budget and return it with its token count."""
+        if not similar_docs:
+            return "No relevant documents found.", 0
 
-        return "\n---\n".join(context_parts)
+        return self.context_packer.pack(similar_docs)
 
     def _create_system_prompt(self, context: str) -> str:
         """Create system prompt with context."""
@@ -245,16 +648,17 @@ class ChatService:
         self,
         system_prompt: str,
         history: List[Dict[str, Any]],
-        current_message: str
+        current_message: str,
+        summary: str = ""
     ) -> List[Any]:
         """Build message list for LLM."""
         messages = [SystemMessage(content=system_prompt)]
 
-        # Add conversation history (limit to relevant messages)
-        max_history = self.settings.max_conversation_length
-        recent_history = history[-max_history:] if len(history) > max_history else history
+        if summary:
+            messages.append(SystemMessage(content=f"Summary of the earlier conversation:\n{summary}"))
 
-        for msg in recent_history:
+        # Add conversation history (already trimmed to the token budget)
+        for msg in history:
             if msg["role"] == "user":
                 messages.append(HumanMessage(content=msg["content"]))
             elif msg["role"] == "assistant":
@@ -264,31 +668,17 @@ class ChatService:
         messages.append(HumanMessage(content=current_message))
         return messages
 
-    def _update_conversation(self, conversation_id: str, user_message: str, ai_response: str):
+    async def _update_conversation(self, conversation_id: str, user_message: str, ai_response: str):
         """Update conversation history."""
-        if conversation_id not in self.conversations:
-            self.conversations[conversation_id] = []
-
-        conversation = self.conversations[conversation_id]
-
-        # Add user message
-        conversation.append({
-            "role": "user",
-            "content": user_message,
-            "timestamp": datetime.now().isoformat()
-        })
-
-        # Add AI response
-        conversation.append({
-            "role": "assistant",
-            "content": ai_response,
-            "timestamp": datetime.now().isoformat()
-        })
-
         # Limit conversation length
         max_length = self.settings.max_conversation_length * 2  # *2 for user+assistant pairs
-        if len(conversation) > max_length:
-            self.conversations[conversation_id] = conversation[-max_length:]
+        await self._conversation_call(
+            self.conversations.append,
+            conversation_id,
+            [("user", user_message), ("assistant", ai_response)],
+            max_length
+        )
+        self._schedule_summary(conversation_id)
 
     def _format_sources(self, similar_docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Format source documents for response."""
@@ -310,14 +700,18 @@ class ChatService:
 
     def get_conversation_history(self, conversation_id: str) -> List[Dict[str, Any]]:
         """Get conversation history."""
-        return self.conversations.get(conversation_id, [])
+        return self.conversations.get(conversation_id)
 
     def clear_conversation(self, conversation_id: str):
         """Clear a specific conversation."""
-        if conversation_id in self.conversations:
-            del self.conversations[conversation_id]
+        self.conversations.delete(conversation_id)
 
     def list_conversations(self) -> List[str]:
         """List all conversation IDs."""
-        return list(self.conversations.keys())
+        return self.conversations.list_ids()
+
+
 
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
@@ -0,0 +1,133 @@
+import logging
+from typing import Any, Dict, List, Tuple
+
+import tiktoken
+
+logger = logging.getLogger(__name__)
+
+# Chat format overhead per message (role markers), as in OpenAI's token counting guide
+TOKENS_PER_MESSAGE = 4
+
+# Don't bother appending a truncated segment smaller than this
+MIN_SEGMENT_TOKENS = 32
+
+# Rough size of a token when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+
+class _ApproximateEncoding:
+    """Stand-in for a tiktoken encoding that counts every 4 characters as a token"""
+
+    def encode(self, text: str, disallowed_special=()) -> List[str]:
+        return [text[i:i + CHARS_PER_TOKEN] for i in range(0, len(text), CHARS_PER_TOKEN)]
+
+    def decode(self, tokens: List[str]) -> str:
+        return "".join(tokens)
+
+
+class ContextPacker:
+    """
+    Packs retrieved chunks into a prompt context under a token budget.
+    Consecutive chunks of the same source are merged (dropping the splitter overlap),
+    then segments are added in relevance order until the budget is used up.
+    """
+
+    def __init__(self, model: str, token_budget: int, max_overlap: int = 200):
+        self.token_budget = token_budget
+        self.max_overlap = max_overlap
+        self.encoding = self._load_encoding(model)
+
+    @staticmethod
+    def _load_encoding(model: str):
+        """
+        tiktoken downloads its BPE files on first use; without network access (and no
+        TIKTOKEN_CACHE_DIR) fall back to approximate counts rather than failing to start
+        """
+        try:
+            try:
+                return tiktoken.encoding_for_model(model.lower())
+            except KeyError:
+                return tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            logger.warning(f"Could not load a tiktoken encoding ({str(e)}); approximating {CHARS_PER_TOKEN} characters per token")
+            return _ApproximateEncoding()
+
+    def count_tokens(self, text: str) -> int:
+        """Number of tokens in a string"""
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def count_message_tokens(self, messages: List[Any]) -> int:
+        """Approximate prompt tokens for a list of chat messages"""
+        return sum(self.count_tokens(str(message.content)) + TOKENS_PER_MESSAGE for message in messages) + 3
+
+    def pack(self, similar_docs: List[Dict[str, Any]]) -> Tuple[str, int]:
+        """Return the context string and its token count"""
+        segments = self._merge_segments(similar_docs)
+
+        parts: List[str] = []
+        used = 0
+        for segment in segments:
+            header = f"Document {len(parts) + 1} (from {segment['source']}):\n"
+            separator = "\n---\n" if parts else ""
+            overhead = self.count_tokens(separator + header + "\n")
+            remaining = self.token_budget - used - overhead
+            if remaining < MIN_SEGMENT_TOKENS:
+                break
+
+            tokens = self.encoding.encode(segment["content"], disallowed_special=())
+            if len(tokens) > remaining:
+                # Lowest-ranked segment that still fits partially is cut at a token boundary
+                content = self.encoding.decode(tokens[:remaining])
+                used += remaining + overhead
+                parts.append(f"{header}{content}\n")
+                break
+
+            used += len(tokens) + overhead
+            parts.append(f"{header}{segment['content']}\n")
+
+        return "\n---\n".join(parts), used
+
+    def _merge_segments(self, similar_docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Merge consecutive chunks of the same file, keeping the best rank of each run"""
+        by_source: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+        for position, doc in enumerate(similar_docs):
+            source = doc["metadata"].get("source", "Unknown")
+            by_source.setdefault(source, []).append((position, doc))
+
+        segments = []
+        for source, docs in by_source.items():
+            docs.sort(key=lambda item: item[1]["metadata"].get("chunk_index", -1))
+            current = None
+            for position, doc in docs:
+                chunk_index = doc["metadata"].get("chunk_index")
+                if (
+                    current is not None
+                    and chunk_index is not None
+                    and current["last_index"] is not None
+                    and chunk_index == current["last_index"] + 1
+                ):
+                    overlap = self._overlap(current["content"], doc["content"])
+                    # Without overlap the splitter dropped the separator between the chunks
+                    current["content"] += doc["content"][overlap:] if overlap else "\n" + doc["content"]
+                    current["last_index"] = chunk_index
+                    current["position"] = min(current["position"], position)
+                    continue
+
+                current = {
+                    "source": source,
+                    "content": doc["content"],
+                    "last_index": chunk_index,
+                    "position": position
+                }
+                segments.append(current)
+
+        # Relevance order is the retrieval order of the best chunk in each segment
+        segments.sort(key=lambda segment: segment["position"])
+        return segments
+
+    def _overlap(self, left: str, right: str) -> int:
+        """Length of the longest suffix of `left` that is a prefix of `right`"""
+        for size in range(min(self.max_overlap, len(left), len(right)), 0, -1):
+            if left.endswith(right[:size]):
+                return size
+        return 0
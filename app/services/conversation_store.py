@@ -0,0 +1,362 @@
+import logging
+import sqlite3
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import Settings
+
+logger = logging.getLogger(__name__)
+
+# (seq, role, content, created_at) - a tuple per message instead of a dict with an ISO string
+_Message = Tuple[int, str, str, float]
+
+
+def _to_dict(message: _Message) -> Dict[str, Any]:
+    seq, role, content, created_at = message
+    return {
+        "role": role,
+        "content": content,
+        "timestamp": datetime.fromtimestamp(created_at).isoformat(),
+        "seq": seq
+    }
+
+
+class _Conversation:
+    """One in-memory conversation"""
+
+    __slots__ = ("last_used", "messages", "next_seq", "summary", "summary_seq")
+
+    def __init__(self, last_used: float):
+        self.last_used = last_used
+        self.messages: Tuple[_Message, ...] = ()
+        self.next_seq = 0
+        self.summary = ""
+        self.summary_seq = 0
+
+
+class ConversationStore(ABC):
+    """Bounded conversation history keyed by conversation ID"""
+
+    def __init__(self, max_conversations: int, ttl_seconds: Optional[float] = None):
+        self.max_conversations = max_conversations
+        self.ttl_seconds = ttl_seconds or None
+        self.evictions = 0
+        self.expirations = 0
+
+    @abstractmethod
+    def get(self, conversation_id: str) -> List[Dict[str, Any]]:
+        """Messages of a conversation, oldest first (empty if unknown or expired)"""
+
+    @abstractmethod
+    def append(self, conversation_id: str, messages: List[Tuple[str, str]], max_messages: int):
+        """Add (role, content) messages and keep only the last `max_messages`"""
+
+    @abstractmethod
+    def get_summary(self, conversation_id: str) -> Tuple[str, int]:
+        """Running summary of older messages and the seq of the first message it does not cover"""
+
+    @abstractmethod
+    def set_summary(self, conversation_id: str, summary: str, summary_seq: int):
+        """Replace the running summary (ignored if the conversation no longer exists)"""
+
+    @abstractmethod
+    def delete(self, conversation_id: str):
+        """Forget a conversation"""
+
+    @abstractmethod
+    def list_ids(self) -> List[str]:
+        """IDs of the live conversations, least recently used first"""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of stored conversations"""
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and eviction counters"""
+        return {
+            "backend": self.backend,
+            "conversations": len(self),
+            "max_conversations": self.max_conversations,
+            "ttl_seconds": self.ttl_seconds,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+    def close(self):
+        """Release backend resources"""
+
+
+class MemoryConversationStore(ConversationStore):
+    """In-process store with LRU eviction above `max_conversations` and idle expiry"""
+
+    backend = "memory"
+
+    def __init__(self, max_conversations: int, ttl_seconds: Optional[float] = None):
+        super().__init__(max_conversations, ttl_seconds)
+        # Recency order doubles as expiry order
+        self._data: "OrderedDict[str, _Conversation]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, conversation_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._expire(time.time())
+            conversation = self._data.get(conversation_id)
+            if conversation is None:
+                return []
+            return [_to_dict(message) for message in conversation.messages]
+
+    def append(self, conversation_id: str, messages: List[Tuple[str, str]], max_messages: int):
+        now = time.time()
+
+        with self._lock:
+            self._expire(now)
+            conversation = self._data.pop(conversation_id, None) or _Conversation(now)
+            new = tuple(
+                (conversation.next_seq + i, sys.intern(role), content, now)
+                for i, (role, content) in enumerate(messages)
+            )
+            conversation.messages = (conversation.messages + new)[-max_messages:]
+            conversation.next_seq += len(new)
+            conversation.last_used = now
+            self._data[conversation_id] = conversation
+
+            while len(self._data) > self.max_conversations:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_summary(self, conversation_id: str) -> Tuple[str, int]:
+        with self._lock:
+            conversation = self._data.get(conversation_id)
+            if conversation is None:
+                return "", 0
+            return conversation.summary, conversation.summary_seq
+
+    def set_summary(self, conversation_id: str, summary: str, summary_seq: int):
+        with self._lock:
+            conversation = self._data.get(conversation_id)
+            if conversation is not None:
+                conversation.summary = summary
+                conversation.summary_seq = summary_seq
+
+    def delete(self, conversation_id: str):
+        with self._lock:
+            self._data.pop(conversation_id, None)
+
+    def list_ids(self) -> List[str]:
+        with self._lock:
+            self._expire(time.time())
+            return list(self._data.keys())
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _expire(self, now: float):
+        """Drop idle conversations; they sit at the front of the recency order"""
+        if self.ttl_seconds is None:
+            return
+        cutoff = now - self.ttl_seconds
+        while self._data:
+            conversation_id, conversation = next(iter(self._data.items()))
+            if conversation.last_used >= cutoff:
+                break
+            del self._data[conversation_id]
+            self.expirations += 1
+
+
+class SQLiteConversationStore(ConversationStore):
+    """Local SQLite store, so history survives restarts; same bounds as the memory store"""
+
+    backend = "sqlite"
+
+    def __init__(
+        self,
+        path: str,
+        max_conversations: int,
+        ttl_seconds: Optional[float] = None,
+        sweep_interval_seconds: float = 30.0
+    ):
+        super().__init__(max_conversations, ttl_seconds)
+        self.path = Path(path)
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._last_sweep = 0.0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS conversations (
+                id TEXT PRIMARY KEY,
+                last_used REAL NOT NULL,
+                summary TEXT NOT NULL DEFAULT '',
+                summary_seq INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(conversations)")}
+        if "summary" not in columns:
+            # Stores created before running summaries existed
+            self._conn.execute("ALTER TABLE conversations ADD COLUMN summary TEXT NOT NULL DEFAULT ''")
+            self._conn.execute("ALTER TABLE conversations ADD COLUMN summary_seq INTEGER NOT NULL DEFAULT 0")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS messages (
+                conversation_id TEXT NOT NULL REFERENCES conversations (id) ON DELETE CASCADE,
+                seq INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (conversation_id, seq)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_conversations_last_used ON conversations (last_used)")
+        self._conn.commit()
+
+        with self._lock:
+            self._sweep(time.time(), force=True)
+            self._conn.commit()
+
+    def get(self, conversation_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_used FROM conversations WHERE id = ?", (conversation_id,)
+            ).fetchone()
+            if row is None or self._is_expired(row[0], time.time()):
+                return []
+            rows = self._conn.execute(
+                "SELECT seq, role, content, created_at FROM messages WHERE conversation_id = ? ORDER BY seq",
+                (conversation_id,)
+            ).fetchall()
+        return [_to_dict(message) for message in rows]
+
+    def append(self, conversation_id: str, messages: List[Tuple[str, str]], max_messages: int):
+        now = time.time()
+        with self._lock:
+            # Take the write lock up front: other workers may append to the same conversation
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._append(conversation_id, messages, max_messages, now)
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self._conn.commit()
+
+    def _append(self, conversation_id: str, messages: List[Tuple[str, str]], max_messages: int, now: float):
+        row = self._conn.execute(
+            "SELECT last_used FROM conversations WHERE id = ?", (conversation_id,)
+        ).fetchone()
+        if row is not None and self._is_expired(row[0], now):
+            self._conn.execute("DELETE FROM conversations WHERE id = ?", (conversation_id,))
+            self.expirations += 1
+
+        # A first turn handled concurrently by another worker may have created the row meanwhile
+        self._conn.execute(
+            "INSERT INTO conversations (id, last_used) VALUES (?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET last_used = excluded.last_used",
+            (conversation_id, now)
+        )
+        next_seq = self._conn.execute(
+            "SELECT COALESCE(MAX(seq) + 1, 0) FROM messages WHERE conversation_id = ?", (conversation_id,)
+        ).fetchone()[0]
+
+        self._conn.executemany(
+            "INSERT INTO messages (conversation_id, seq, role, content, created_at) VALUES (?, ?, ?, ?, ?)",
+            [
+                (conversation_id, next_seq + i, role, content, now)
+                for i, (role, content) in enumerate(messages)
+            ]
+        )
+        self._conn.execute(
+            "DELETE FROM messages WHERE conversation_id = ? AND seq < ?",
+            (conversation_id, next_seq + len(messages) - max_messages)
+        )
+
+        # Counted inside the transaction: every worker writes to this table
+        overflow = self._conn.execute("SELECT COUNT(*) FROM conversations").fetchone()[0] - self.max_conversations
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM conversations WHERE id IN "
+                "(SELECT id FROM conversations ORDER BY last_used ASC LIMIT ?)",
+                (overflow,)
+            )
+            self.evictions += overflow
+
+        self._sweep(now)
+
+    def get_summary(self, conversation_id: str) -> Tuple[str, int]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary, summary_seq FROM conversations WHERE id = ?", (conversation_id,)
+            ).fetchone()
+        return (row[0], row[1]) if row is not None else ("", 0)
+
+    def set_summary(self, conversation_id: str, summary: str, summary_seq: int):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE conversations SET summary = ?, summary_seq = ? WHERE id = ?",
+                (summary, summary_seq, conversation_id)
+            )
+            self._conn.commit()
+
+    def delete(self, conversation_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM conversations WHERE id = ?", (conversation_id,))
+            self._conn.commit()
+
+    def list_ids(self) -> List[str]:
+        with self._lock:
+            self._sweep(time.time(), force=True)
+            self._conn.commit()
+            rows = self._conn.execute("SELECT id FROM conversations ORDER BY last_used ASC").fetchall()
+        return [row[0] for row in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM conversations").fetchone()[0]
+
+    def _is_expired(self, last_used: float, now: float) -> bool:
+        return self.ttl_seconds is not None and last_used < now - self.ttl_seconds
+
+    def _sweep(self, now: float, force: bool = False):
+        """Delete idle conversations, at most once per sweep interval unless forced"""
+        if self.ttl_seconds is None or (not force and now - self._last_sweep < self.sweep_interval_seconds):
+            return
+        self._last_sweep = now
+        expired = self._conn.execute(
+            "DELETE FROM conversations WHERE last_used < ?", (now - self.ttl_seconds,)
+        ).rowcount
+        if expired:
+            self.expirations += expired
+            logger.debug(f"Expired {expired} idle conversations")
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+
+def build_conversation_store(settings: Settings) -> ConversationStore:
+    """Create the conversation store selected in settings"""
+    backend = settings.conversation_store.lower()
+    if backend == "memory":
+        return MemoryConversationStore(
+            max_conversations=settings.conversation_max_count,
+            ttl_seconds=settings.conversation_ttl_seconds
+        )
+    if backend == "sqlite":
+        return SQLiteConversationStore(
+            path=str(Path(settings.chroma_db_path) / settings.conversation_store_file),
+            max_conversations=settings.conversation_max_count,
+            ttl_seconds=settings.conversation_ttl_seconds
+        )
+    raise ValueError(f"Unknown conversation store: {settings.conversation_store}")
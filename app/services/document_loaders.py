@@ -0,0 +1,37 @@
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+# Kept free of service-level imports so process-pool workers start quickly. Loaders are
+# imported on first use: the DOCX (unstructured) and PDF stacks are slow to import and
+# only needed when such a file is actually indexed.
+
+
+def get_loader(file_path: Path):
+    """Get appropriate document loader based on file extension"""
+    extension = file_path.suffix.lower()
+
+    if extension == ".py":
+        from langchain_community.document_loaders.python import PythonLoader
+        return PythonLoader(str(file_path))
+    elif extension == ".json":
+        from langchain_community.document_loaders.json_loader import JSONLoader
+        return JSONLoader(str(file_path), jq_schema=".")
+    elif extension == ".docx":
+        from langchain_community.document_loaders.word_document import UnstructuredWordDocumentLoader
+        return UnstructuredWordDocumentLoader(str(file_path))
+    elif extension == ".pdf":
+        from langchain_community.document_loaders.pdf import PyPDFLoader
+        return PyPDFLoader(str(file_path))
+    else:
+        # Markdown, text and similar files
+        from langchain_community.document_loaders.text import TextLoader
+        return TextLoader(str(file_path), encoding="utf-8")
+
+
+def load_file(file_path: str) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Load a file and return plain (text, metadata) pairs.
+    Used as the process-pool entry point, so the result must be picklable.
+    """
+    documents = get_loader(Path(file_path)).load()
+    return [(doc.page_content, dict(doc.metadata)) for doc in documents]
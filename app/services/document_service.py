@@ -1,32 +1,41 @@
+import hashlib
+import json
 import logging
+import os
+import multiprocessing
 import warnings
-import chromadb
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
 import asyncio
+import functools
+import time
+from contextlib import asynccontextmanager
 
 # Suppress ChromaDB telemetry warnings
 warnings.filterwarnings("ignore", category=UserWarning, message=".*telemetry.*")
 warnings.filterwarnings("ignore", category=UserWarning, message=".*capture.*")
 
-from chromadb.config import Settings as ChromaSettings
 from langchain.text_splitter import RecursiveCharacterTextSplitter, MarkdownTextSplitter
 from langchain.schema import Document
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.document_loaders import (
-    TextLoader,
-    PythonLoader,
-    UnstructuredMarkdownLoader,
-    JSONLoader,
-    UnstructuredWordDocumentLoader,
-    PyPDFLoader,
-)
 
+from app.core import metrics
+from app.core.cache import LRUCache
 from app.core.config import Settings
+from app.services.embedding_batcher import QueryEmbeddingBatcher
+from app.services.document_loaders import get_loader, load_file
+from app.services.embedders import build_embedder
+from app.services.embedding_cache import EmbeddingCache
+from app.services.index_coordinator import IndexCoordinator
+from app.services.lexical_index import LexicalIndex, reciprocal_rank_fusion
+from app.services.reranker import CrossEncoderReranker
+from app.services.vector_index import VectorIndex
 
 logger = logging.getLogger(__name__)
 
+# Bump when the chunk ID scheme or manifest layout changes
+MANIFEST_VERSION = 2
+
 
 class DocumentService:
     """Service for handling document processing and vector storage"""
@@ -34,26 +43,40 @@ class DocumentService:
     def __init__(self, settings: Settings):
         self.settings = settings
 
-        # Initialize embeddings using sentence-transformers
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-mpnet-base-v2",
-            model_kwargs={'device': 'cpu'}
-        )
+        # Initialize embeddings with the configured backend
+        self.embeddings = build_embedder(settings)
+
+        # Persistent cache of chunk embeddings keyed by (model, text hash)
+        self.embedding_cache: Optional[EmbeddingCache] = None
+        if settings.embedding_cache_enabled:
+            self.embedding_cache = EmbeddingCache(
+                path=str(Path(settings.chroma_db_path) / settings.embedding_cache_file),
+                model_name=self.embeddings.cache_key,
+                max_entries=settings.embedding_cache_max_entries
+            )
 
-        self.chroma_client = chromadb.PersistentClient(
-            path=settings.chroma_db_path,
-            settings=ChromaSettings(anonymized_telemetry=False)
+        # In-process cache of query embeddings keyed by normalized query text
+        self.query_embedding_cache = LRUCache(
+            maxsize=settings.query_embedding_cache_size,
+            ttl_seconds=settings.query_embedding_cache_ttl_seconds
         )
+        self._query_embedding_ms_avg = 0.0
+        self._query_embedding_saved_ms = 0.0
 
+        self.chroma_client = _open_chroma_client(settings.chroma_db_path)
 
-        # Get or create collection
-        try:
-            self.collection = self.chroma_client.get_collection(settings.collection_name)
-        except Exception:
-            self.collection = self.chroma_client.create_collection(
-                name=settings.collection_name,
-                metadata={"description": "RAG documents collection"}
-            )
+        # Coordinates writers and index reloads with other worker processes
+        self.coordinator = IndexCoordinator(settings.chroma_db_path)
+        self._loaded_generation = self.coordinator.generation()
+        self._generation_checked_at = time.monotonic()
+
+        # The collection version queries are served from (named by the alias file), with its
+        # manifest and in-process indexes; a full rebuild fills a new version and swaps it in
+        self.active: _CollectionVersion = self._open_version(
+            self.chroma_client, self.coordinator.read_alias()["active"]
+        )
+        self.building: Optional[Dict[str, Any]] = None
+        self._gc_task: Optional[asyncio.Task] = None
 
         # Initialize text splitter
         self.text_splitter = RecursiveCharacterTextSplitter(
@@ -72,8 +95,108 @@ class DocumentService:
         # Thread pool for file processing
         self.executor = ThreadPoolExecutor(max_workers=4)
 
+        # Chroma calls are blocking, so they run off the event loop: reads on their own
+        # bounded pool, writes on a single thread so a large batch never occupies the readers
+        self.chroma_read_executor = ThreadPoolExecutor(
+            max_workers=settings.chroma_read_workers,
+            thread_name_prefix="chroma-read"
+        )
+        self.chroma_write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chroma-write")
+        self._chroma_read_semaphore = asyncio.Semaphore(settings.chroma_query_concurrency)
+        self._executors = {
+            "files": self.executor,
+            "chroma_read": self.chroma_read_executor,
+            "chroma_write": self.chroma_write_executor
+        }
+        self._chroma_read_queue_depth = metrics.EXECUTOR_QUEUE_DEPTH.labels("chroma_read")
+
+        # Optional cross-encoder rerank stage
+        self.reranker: Optional[CrossEncoderReranker] = None
+        if settings.rerank_enabled:
+            self.reranker = CrossEncoderReranker(
+                model_name=settings.rerank_model,
+                executor=self.executor,
+                cache_size=settings.rerank_cache_size
+            )
+
+        # Incremented on every change to the indexed chunks, so caches can invalidate
+        self.index_version = 0
+
+        # Optional process pool for GIL-bound parsers (PDF, DOCX)
+        self.parse_pool: Optional[ProcessPoolExecutor] = None
+        if settings.parser_backend.lower() == "process":
+            workers = settings.parser_workers or os.cpu_count() or 1
+            # Spawned workers never inherit the loaded model or Chroma handles
+            self.parse_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(f"Using process-pool parsing with {workers} workers")
+
+        # Concurrent query embeddings are coalesced into batched forward passes
+        self.query_batcher = QueryEmbeddingBatcher(
+            embed_fn=self.embeddings.embed_documents,
+            executor=self.executor,
+            window_ms=settings.query_batch_window_ms,
+            max_batch_size=settings.query_batch_max_size
+        )
+
+        # Serializes index mutations (sync, clear) within this process; see _exclusive_index
+        self._index_lock = asyncio.Lock()
+
+        # Progress of the current (or last) sync, reported by /ready
+        self.sync_progress: Dict[str, Any] = {"state": "idle"}
+
     async def auto_load_documents(self) -> Dict[str, Any]:
-        """Auto-load documents from the default documents folder"""
+        """
+        Auto-load documents from the default documents folder.
+        The persisted index is checked first, so a warm restart only stats the files; an
+        inconsistent index keeps serving while a replacement is built next to it.
+        """
+        if await self.verify_index():
+            result = await self.refresh_documents()
+        else:
+            result = await self.rebuild_index()
+
+        if result["processed_files"] > 0 or result["deleted_files"] > 0:
+            logger.info(
+                f"Auto-loaded {result['processed_files']} files, {result['total_chunks']} chunks "
+                f"({result['unchanged_files']} unchanged, {result['deleted_files']} deleted)"
+            )
+        elif result["unchanged_files"] > 0:
+            logger.info(f"Index is current, {result['unchanged_files']} files unchanged")
+        else:
+            logger.warning("No documents were auto-loaded")
+
+        return result
+
+    async def verify_index(self) -> bool:
+        """
+        Check that the active collection matches its manifest.
+        If it does not (legacy random chunk IDs, lost manifest, changed chunking) it needs a
+        full rebuild (see rebuild_index). Vectors from a different embedding model cannot
+        answer queries at all, so in that case the collection is emptied right away.
+        """
+        async with self._exclusive_index():
+            active = self.active
+            expected = sum(len(entry.get("chunk_ids", [])) for entry in active.manifest.values())
+            actual = await self._chroma_read(active.collection.count)
+
+            if active.manifest_current and expected == actual:
+                logger.info(f"Persisted index is consistent with the manifest ({actual} chunks)")
+                return True
+
+            logger.warning(
+                f"Persisted index is out of date (manifest: {expected} chunks, collection: {actual}); "
+                "it needs a full rebuild"
+            )
+            if active.embedding_model != self.embeddings.cache_key:
+                logger.warning("Stored vectors come from another embedding model; clearing them now")
+                await self._activate(await self._chroma_write(self._create_version, self._next_version()))
+            return False
+
+    async def refresh_documents(self, progress: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Incrementally sync the default documents folder with the vector database"""
         documents_folder = Path(self.settings.documents_folder)
 
         if not documents_folder.exists():
@@ -81,94 +204,351 @@ class DocumentService:
             return {
                 "processed_files": 0,
                 "total_chunks": 0,
+                "added_files": 0,
+                "updated_files": 0,
+                "deleted_files": 0,
+                "unchanged_files": 0,
                 "details": [f"Documents folder not found: {documents_folder}"]
             }
 
-        # Default file patterns for supported extensions
         file_patterns = [f"*{ext}" for ext in self.settings.supported_extensions]
-        logger.info(f"Auto-loading documents from: {documents_folder}")
-
-        result = await self.process_documents(str(documents_folder), file_patterns)
-
-        if result["processed_files"] > 0:
-            logger.info(f"Auto-loaded {result['processed_files']} files, {result['total_chunks']} chunks")
-        else:
-            logger.warning("No documents were auto-loaded")
-
-        return result
+        return await self.sync_documents(str(documents_folder), file_patterns, remove_missing=True, progress=progress)
 
-    async def process_documents(self, folder_path: str, file_patterns: List[str]) -> Dict[str, Any]:
+    async def process_documents(
+        self,
+        folder_path: str,
+        file_patterns: List[str],
+        progress: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         """Process documents from a folder and add them to the vector database"""
+        return await self.sync_documents(folder_path, file_patterns, remove_missing=False, progress=progress)
+
+    async def sync_documents(
+        self,
+        folder_path: str,
+        file_patterns: List[str],
+        remove_missing: bool = False,
+        progress: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Bring the vector database in line with a folder using the manifest.
+        Only added or changed files are parsed and embedded; when `remove_missing`
+        is set, chunks of files that disappeared from the folder are deleted.
+        Counters are written into `progress` (and exposed as `sync_progress`) as the sync runs.
+        """
         folder = Path(folder_path)
 
         if not folder.exists():
             raise ValueError(f"Folder does not exist: {folder_path}")
 
-        # Find matching files
+        progress = progress if progress is not None else {}
+        progress.update({"state": "waiting", "folder": str(folder)})
+        self.sync_progress = progress
+
+        async with self._exclusive_index():
+            progress["state"] = "discovering"
+            target = self.active
+            loop = asyncio.get_event_loop()
+            valid_files = await loop.run_in_executor(self.executor, self._discover_files, folder, file_patterns)
+
+            # Files that are indexed but no longer present in the folder
+            removed_keys = []
+            if remove_missing:
+                present = {str(file_path) for file_path in valid_files}
+                removed_keys = [
+                    key for key in target.manifest
+                    if key not in present and Path(key).is_relative_to(folder)
+                ]
+
+            result = await self._apply_changes(target, valid_files, removed_keys, progress)
+
+        if not valid_files and not removed_keys:
+            result["details"].append("No valid files found to process")
+
+        logger.info(
+            f"Synced {folder}: {result['added_files']} added, {result['updated_files']} updated, "
+            f"{result['deleted_files']} deleted, {result['unchanged_files']} unchanged"
+        )
+        return result
+
+    async def sync_paths(self, paths: List[Path], progress: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Re-index only the given paths, e.g. the files a folder watcher saw change.
+        Directories are scanned; paths that no longer exist (or are no longer indexable)
+        have their chunks, and those of any indexed file below them, deleted.
+        """
+        progress = progress if progress is not None else {}
+        progress.update({"state": "waiting", "folder": None})
+        self.sync_progress = progress
+
+        async with self._exclusive_index():
+            progress["state"] = "discovering"
+            target = self.active
+            loop = asyncio.get_event_loop()
+            valid_files, removed_keys = await loop.run_in_executor(
+                self.executor, self._resolve_paths, paths, list(target.manifest)
+            )
+            result = await self._apply_changes(target, valid_files, removed_keys, progress)
+
+        logger.info(
+            f"Synced {len(paths)} changed paths: {result['added_files']} added, "
+            f"{result['updated_files']} updated, {result['deleted_files']} deleted"
+        )
+        return result
+
+    async def _apply_changes(
+        self,
+        target: "_CollectionVersion",
+        valid_files: List[Path],
+        removed_keys: List[str],
+        progress: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Delete the chunks of `removed_keys` and ingest whichever of `valid_files` differ
+        from the target's manifest. Must be called while holding the index (see _exclusive_index).
+        """
+        # Classify files against the manifest
+        loop = asyncio.get_event_loop()
+        changed_files = []
+        unchanged_count = 0
+        stats = await loop.run_in_executor(self.executor, _stat_files, valid_files)
+
+        for file_path, stat in zip(valid_files, stats):
+            if stat is None:
+                # Removed since discovery; the next sync deletes its chunks
+                continue
+            key = str(file_path)
+            entry = target.manifest.get(key)
+
+            # Cheap check first: same size and mtime means the file was not touched
+            if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+                unchanged_count += 1
+                continue
+
+            content_hash = await loop.run_in_executor(self.executor, _hash_file, file_path)
+            if entry and entry["content_hash"] == content_hash:
+                # Touched but identical content, just refresh the stat info
+                entry.update({"size": stat.st_size, "mtime": stat.st_mtime})
+                unchanged_count += 1
+                continue
+
+            changed_files.append((file_path, stat, content_hash))
+
+        progress.update({
+            "state": "running",
+            "files_discovered": len(valid_files),
+            "files_unchanged": unchanged_count,
+            "files_to_process": len(changed_files),
+            "files_parsed": 0,
+            "files_embedded": 0,
+            "files_added": 0,
+            "files_failed": 0,
+            "files_deleted": len(removed_keys),
+            "chunks_embedded": 0,
+            "chunks_added": 0,
+            "started_at": time.time()
+        })
+
+        for key in removed_keys:
+            await self._delete_chunks(target, target.manifest.pop(key).get("chunk_ids", []))
+        metrics.INGEST_FILES_DELETED.inc(len(removed_keys))
+
+        # Stream changed files through the ingestion pipeline
+        try:
+            ingest_result = await self._ingest_files(target, changed_files, progress)
+        except asyncio.CancelledError:
+            progress.update({"state": "cancelled", "finished_at": time.time()})
+            raise
+        except BaseException:
+            progress.update({"state": "failed", "finished_at": time.time()})
+            raise
+        finally:
+            # Files committed so far stay indexed; the rest are picked up by the next sync
+            await self._save_manifest(target)
+        progress.update({"state": "done", "finished_at": time.time()})
+
+        return {
+            "processed_files": ingest_result["added_files"] + ingest_result["updated_files"],
+            "total_chunks": ingest_result["total_chunks"],
+            "added_files": ingest_result["added_files"],
+            "updated_files": ingest_result["updated_files"],
+            "deleted_files": len(removed_keys),
+            "unchanged_files": unchanged_count,
+            "details": ingest_result["details"]
+        }
+
+    async def _ingest_files(
+        self,
+        target: "_CollectionVersion",
+        files: List[Tuple[Path, os.stat_result, str]],
+        progress: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Streaming ingestion pipeline: load/split -> embed -> add.
+        Stages are connected by bounded queues and chunks are embedded and written in
+        fixed-size batches, so memory depends on the batch size rather than the corpus
+        size and every batch is searchable as soon as it is written. A file's manifest
+        entry is committed once all of its chunks are in the collection.
+        """
+        result = {"added_files": 0, "updated_files": 0, "total_chunks": 0, "details": []}
+        if not files:
+            return result
+
+        batch_size = max(1, self.settings.ingest_batch_size)
+        file_queue: asyncio.Queue = asyncio.Queue()
+        chunk_queue: asyncio.Queue = asyncio.Queue(maxsize=max(batch_size, self.settings.ingest_queue_size))
+        embedded_queue: asyncio.Queue = asyncio.Queue(maxsize=2)
+        written_ids: Dict[str, List[str]] = {}
+
+        for item in files:
+            file_queue.put_nowait(item)
+
+        async def load_stage():
+            while True:
+                try:
+                    file_path, stat, content_hash = file_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    chunks = await self._process_single_file(file_path)
+                except Exception as e:
+                    result["details"].append(f"Error processing {file_path}: {str(e)}")
+                    progress["files_failed"] += 1
+                    metrics.INGEST_FILES_FAILED.inc()
+                    continue
+                progress["files_parsed"] += 1
+                for chunk in chunks:
+                    await chunk_queue.put(chunk)
+                # Marks the end of this file's chunks in the stream
+                await chunk_queue.put(_FileDone(file_path, stat, content_hash))
+
+        async def produce():
+            workers = max(1, self.settings.ingest_load_concurrency)
+            await asyncio.gather(*(load_stage() for _ in range(workers)))
+            await chunk_queue.put(_END_OF_STREAM)
+
+        async def embed_stage():
+            chunks: List[Document] = []
+            markers: List[_FileDone] = []
+            while True:
+                item = await chunk_queue.get()
+                if item is not _END_OF_STREAM:
+                    if isinstance(item, _FileDone):
+                        markers.append(item)
+                    else:
+                        chunks.append(item)
+                    if len(chunks) < batch_size:
+                        continue
+                # File markers travel with the batch that contains (or follows) their last chunk
+                if chunks or markers:
+                    embedded = await self._embed_documents(chunks)
+                    progress["chunks_embedded"] += len(chunks)
+                    progress["files_embedded"] += len(markers)
+                    await embedded_queue.put((embedded, markers))
+                    chunks, markers = [], []
+                if item is _END_OF_STREAM:
+                    await embedded_queue.put(_END_OF_STREAM)
+                    return
+
+        async def add_stage():
+            loop = asyncio.get_running_loop()
+            last_save = loop.time()
+            while True:
+                item = await embedded_queue.get()
+                if item is _END_OF_STREAM:
+                    return
+                (ids, texts, metadatas, embeddings), markers = item
+                await self._write_documents(target, ids, texts, metadatas, embeddings)
+                result["total_chunks"] += len(ids)
+                progress["chunks_added"] = result["total_chunks"]
+                metrics.INGEST_CHUNKS.inc(len(ids))
+                for cid, metadata in zip(ids, metadatas):
+                    written_ids.setdefault(metadata.get("source", ""), []).append(cid)
+
+                for marker in markers:
+                    await self._commit_file(target, marker, written_ids.pop(str(marker.file_path), []), result)
+                progress["files_added"] += len(markers)
+                # Checkpoint now and then; rewriting the whole manifest per batch is quadratic
+                if markers and loop.time() - last_save >= self.settings.ingest_manifest_save_interval_seconds:
+                    await self._save_manifest(target)
+                    last_save = loop.time()
+
+        stages = [asyncio.ensure_future(stage()) for stage in (produce, embed_stage, add_stage)]
+        try:
+            await asyncio.gather(*stages)
+        except BaseException:
+            # gather() does not cancel siblings; stop the pipeline so no stage waits forever
+            for stage in stages:
+                stage.cancel()
+            raise
+
+        return result
+
+    def _discover_files(self, folder: Path, file_patterns: List[str]) -> List[Path]:
+        """Find files matching the patterns, filtered by supported extension and size"""
         files_to_process = []
         for pattern in file_patterns:
             files_to_process.extend(folder.rglob(pattern))
 
-        # Filter by supported extensions and file size
         valid_files = []
+        seen = set()
         for file_path in files_to_process:
-            if file_path.is_file():
-                if file_path.suffix.lower() in self.settings.supported_extensions:
-                    file_size_mb = file_path.stat().st_size / (1024 * 1024)
-                    if file_size_mb <= self.settings.max_file_size_mb:
-                        valid_files.append(file_path)
-
-        if not valid_files:
-            return {
-                "processed_files": 0,
-                "total_chunks": 0,
-                "details": ["No valid files found to process"]
-            }
-
-        # Process files concurrently
-        tasks = [self._process_single_file(file_path) for file_path in valid_files]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+            if file_path in seen:
+                continue
+            seen.add(file_path)
+            if file_path.is_file() and self._is_indexable(file_path):
+                valid_files.append(file_path)
 
-        all_documents = []
-        processed_count = 0
-        error_details = []
+        return valid_files
 
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                error_details.append(f"Error processing {valid_files[i]}: {str(result)}")
+    def _resolve_paths(self, paths: List[Path], manifest_keys: List[str]) -> Tuple[List[Path], List[str]]:
+        """Split changed paths into files to (re)index and manifest keys whose chunks must go"""
+        valid_files: List[Path] = []
+        removed_keys: List[str] = []
+        for path in paths:
+            if path.is_dir():
+                valid_files.extend(self._discover_files(path, ["*"]))
+            elif path.is_file() and self._is_indexable(path):
+                valid_files.append(path)
             else:
-                all_documents.extend(result)
-                processed_count += 1
+                removed_keys.extend(
+                    key for key in manifest_keys
+                    if key == str(path) or Path(key).is_relative_to(path)
+                )
 
-        # Add documents to the vector database
-        if all_documents:
-            await self._add_documents_to_db(all_documents)
+        # A path can show up both as a file and under one of its directories
+        return list(dict.fromkeys(valid_files)), list(dict.fromkeys(removed_keys))
 
-        return {
-            "processed_files": processed_count,
-            "total_chunks": len(all_documents),
-            "details": error_details if error_details else []
-        }
+    def _is_indexable(self, file_path: Path) -> bool:
+        """Supported extension and within the size limit"""
+        if file_path.suffix.lower() not in self.settings.supported_extensions:
+            return False
+        return file_path.stat().st_size / (1024 * 1024) <= self.settings.max_file_size_mb
 
     async def _process_single_file(self, file_path: Path) -> List[Document]:
         """Process a single file and return document chunks"""
         try:
-            # Load document based on file type
-            loader = self.get_loader(file_path)
-
             loop = asyncio.get_event_loop()
-            documents = await loop.run_in_executor(self.executor, loader.load)
+
+            # Load document based on file type
+            if self.parse_pool is not None and file_path.suffix.lower() in self.settings.process_parse_extensions:
+                pages = await loop.run_in_executor(self.parse_pool, load_file, str(file_path))
+                documents = [Document(page_content=text, metadata=metadata) for text, metadata in pages]
+            else:
+                loader = self.get_loader(file_path)
+                documents = await loop.run_in_executor(self.executor, loader.load)
 
             # Split documents into chunks
             chunks = self.text_splitter.split_documents(documents)
 
             # Add metadata
-            for chunk in chunks:
+            for index, chunk in enumerate(chunks):
                 chunk.metadata.update({
                     "source": str(file_path),
                     "file_type": file_path.suffix,
                     "file_name": file_path.name,
-                    "file_size": file_path.stat().st_size
+                    "file_size": file_path.stat().st_size,
+                    "chunk_index": index
                 })
 
             return chunks
@@ -179,71 +559,548 @@ class DocumentService:
 
     def get_loader(self, file_path: Path):
         """Get appropriate document loader based on file extension"""
-        extension = file_path.suffix.lower()
-
-        if extension == ".py":
-            return PythonLoader(str(file_path))
-        elif extension == ".md":
-            return TextLoader(str(file_path), encoding="utf-8")
-        elif extension == ".json":
-            return JSONLoader(str(file_path), jq_schema=".")
-        elif extension == ".docx":
-            return UnstructuredWordDocumentLoader(str(file_path))
-        elif extension == ".pdf":
-            return PyPDFLoader(str(file_path))
-        else:
-            # Default loader for text and similar files
-            return TextLoader(str(file_path), encoding="utf-8")
-        
-    
-    async def _add_documents_to_db(self, documents: List[Document]):
-        """Add documents to ChromaDB vector database"""
-        if not documents:
-            return
+        return get_loader(file_path)
 
+    async def _embed_documents(self, documents: List[Document]) -> Tuple[List[str], List[str], List[Dict[str, Any]], List[List[float]]]:
+        """Embed document chunks and derive their IDs"""
         # Extract texts and metadata
         texts = [doc.page_content for doc in documents]
         metadatas = [doc.metadata for doc in documents]
 
+        if not texts:
+            return [], [], [], []
+
         # Generate embeddings asynchronously
         loop = asyncio.get_event_loop()
         embeddings = await loop.run_in_executor(
             self.executor,
-            self.embeddings.embed_documents,
+            self._embed_texts,
             texts
         )
 
-        # Generate unique IDs
-        ids = [f"doc_{i}_{abs(hash(text[:100]))}" for i, text in enumerate(texts)]
+        # Deterministic, content-addressed IDs
+        ids = [
+            chunk_id(metadata.get("source", ""), metadata.get("chunk_index", 0), text)
+            for text, metadata in zip(texts, metadatas)
+        ]
 
-        # Add to ChromaDB collection
+        return ids, texts, metadatas, embeddings
+
+    async def _write_documents(
+        self,
+        target: "_CollectionVersion",
+        ids: List[str],
+        texts: List[str],
+        metadatas: List[Dict[str, Any]],
+        embeddings: List[List[float]]
+    ):
+        """Write embedded chunks to the ChromaDB collection"""
+        if not ids:
+            return
+
+        # Upsert into ChromaDB collection (re-adding the same chunk is a no-op)
         try:
-            self.collection.add(
+            await self._chroma_write(
+                target.collection.upsert,
                 embeddings=embeddings,
                 documents=texts,
                 metadatas=metadatas,
                 ids=ids
             )
+            if target.lexical_index is not None:
+                target.lexical_index.add(ids, texts, metadatas)
+            if target.vector_index is not None:
+                target.vector_index.add(ids, texts, metadatas, embeddings)
             logger.info(f"Added {len(texts)} documents to ChromaDB collection.")
         except Exception as e:
             logger.error(f"Error adding documents to ChromaDB: {e}")
             raise
+        finally:
+            self._mark_changed(target)
+
+    async def _commit_file(
+        self,
+        target: "_CollectionVersion",
+        marker: "_FileDone",
+        chunk_ids: List[str],
+        result: Dict[str, Any]
+    ):
+        """Record a fully written file in the manifest and drop its stale chunks"""
+        key = str(marker.file_path)
+        previous = target.manifest.get(key)
+
+        if previous:
+            # Chunk IDs are content-addressed, so unchanged chunks were simply overwritten
+            new_ids = set(chunk_ids)
+            stale_ids = [cid for cid in previous.get("chunk_ids", []) if cid not in new_ids]
+            await self._delete_chunks(target, stale_ids)
+            result["updated_files"] += 1
+            metrics.INGEST_FILES_UPDATED.inc()
+        else:
+            result["added_files"] += 1
+            metrics.INGEST_FILES_ADDED.inc()
+
+        target.manifest[key] = {
+            "size": marker.stat.st_size,
+            "mtime": marker.stat.st_mtime,
+            "content_hash": marker.content_hash,
+            "chunk_ids": chunk_ids
+        }
+
+    def _embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, reusing cached vectors and only running the model on misses"""
+        if self.embedding_cache is None:
+            return self.embeddings.embed_documents(texts)
+
+        vectors = self.embedding_cache.get_many(texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        metrics.EMBEDDING_CACHE_HITS.inc(len(texts) - len(missing))
+        metrics.EMBEDDING_CACHE_MISSES.inc(len(missing))
+
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            computed = self.embeddings.embed_documents(missing_texts)
+            self.embedding_cache.put_many(missing_texts, computed)
+            for i, vector in zip(missing, computed):
+                vectors[i] = vector
+
+        logger.info(f"Embedded {len(missing)} chunks, {len(texts) - len(missing)} served from cache")
+        return vectors
 
-    async def search_similar_documents(self, query: str, k: int = None) -> List[Dict[str, Any]]:
-        """Search for similar documents"""
+    async def _delete_chunks(self, target: "_CollectionVersion", chunk_ids: List[str]):
+        """Delete chunks from ChromaDB by ID"""
+        if not chunk_ids:
+            return
+
+        try:
+            await self._chroma_write(target.collection.delete, ids=chunk_ids)
+            if target.lexical_index is not None:
+                target.lexical_index.remove(chunk_ids)
+            if target.vector_index is not None:
+                target.vector_index.remove(chunk_ids)
+            logger.info(f"Deleted {len(chunk_ids)} chunks from ChromaDB collection.")
+        except Exception as e:
+            logger.error(f"Error deleting chunks from ChromaDB: {e}")
+            raise
+        finally:
+            self._mark_changed(target)
+
+    def _mark_changed(self, target: "_CollectionVersion"):
+        """
+        Invalidate version-keyed caches and have the write session publish a new generation,
+        but only when the served collection changed; a shadow build is published by _activate
+        """
+        if target is self.active:
+            self.index_version += 1
+
+    def _load_manifest(self, manifest_path: Path) -> Tuple[Dict[str, Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """Load a per-file index manifest from disk, with the index config it was built with"""
+        if not manifest_path.exists():
+            return {}, self._index_config()
+
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable index manifest {manifest_path}: {e}")
+            return {}, None
+
+        if data.get("index_config") != self._index_config():
+            logger.warning("Index manifest was built with a different configuration")
+            return {}, data.get("index_config")
+
+        return data.get("files", {}), data["index_config"]
+
+    async def _save_manifest(self, target: "_CollectionVersion"):
+        """Persist the per-file index manifest atomically, serialized off the event loop"""
+        # The thread serializes a snapshot, so later commits cannot change the dict under it
+        data = {"index_config": self._index_config(), "files": dict(target.manifest)}
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.chroma_write_executor, _write_manifest, target.manifest_path, data)
+
+    def _index_config(self) -> Dict[str, Any]:
+        """Settings that invalidate every stored chunk when they change"""
+        return {
+            "manifest_version": MANIFEST_VERSION,
+            "embedding_model": self.embeddings.cache_key,
+            "chunk_size": self.settings.chunk_size,
+            "chunk_overlap": self.settings.chunk_overlap
+        }
+
+    def record_executor_queues(self):
+        """Publish how many tasks wait for a thread in each pool (sampled on Chroma calls and scrapes)"""
+        for name, executor in self._executors.items():
+            metrics.EXECUTOR_QUEUE_DEPTH.labels(name).set(executor._work_queue.qsize())
+
+    async def _chroma_read(self, fn, *args, **kwargs):
+        """Run a Chroma read on the read pool, bounded by the query concurrency limit"""
+        self._chroma_read_queue_depth.set(self.chroma_read_executor._work_queue.qsize())
+        async with self._chroma_read_semaphore:
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(self.chroma_read_executor, functools.partial(fn, *args, **kwargs))
+
+    async def _chroma_write(self, fn, *args, **kwargs):
+        """Run a Chroma write on the dedicated single-thread write pool"""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self.chroma_write_executor, functools.partial(fn, *args, **kwargs))
+
+    def _build_memory_indexes(
+        self,
+        collection,
+        page_size: int = 1000
+    ) -> Tuple[Optional[LexicalIndex], Optional[VectorIndex]]:
+        """Build fresh in-process lexical and vector indexes from the chunks stored in a collection"""
+        lexical_index = LexicalIndex() if self.settings.hybrid_search_enabled else None
+        vector_index = None
+        if self.settings.vector_index_enabled:
+            vector_index = VectorIndex(
+                path=str(Path(self.settings.chroma_db_path) / self.settings.vector_index_file),
+                dtype=self.settings.vector_index_dtype
+            )
+        if lexical_index is None and vector_index is None:
+            return None, None
+
+        include = ["documents", "metadatas"]
+        if vector_index is not None:
+            include.append("embeddings")
+
+        offset = 0
+        while True:
+            page = collection.get(include=include, limit=page_size, offset=offset)
+            if not page["ids"]:
+                break
+            if lexical_index is not None:
+                lexical_index.add(page["ids"], page["documents"], page["metadatas"])
+            if vector_index is not None:
+                vector_index.add(page["ids"], page["documents"], page["metadatas"], page["embeddings"])
+            offset += len(page["ids"])
+
+        if lexical_index is not None:
+            logger.info(f"Lexical index loaded with {len(lexical_index)} chunks")
+        if vector_index is not None:
+            logger.info(f"Vector index loaded with {len(vector_index)} chunks")
+        return lexical_index, vector_index
+
+    @asynccontextmanager
+    async def _exclusive_index(self):
+        """
+        Hold the index for a write session: the in-process lock plus the cross-process
+        write lock. The local view is brought up to date first (another worker may have
+        written since), and the generation is bumped afterwards if anything changed.
+        """
+        async with self._index_lock:
+            loop = asyncio.get_event_loop()
+            acquire = loop.run_in_executor(self.executor, self.coordinator.acquire_write)
+            try:
+                write_lock = await asyncio.shield(acquire)
+            except asyncio.CancelledError:
+                # A cancelled job may be waiting here; the thread still takes the lock, so hand
+                # back exactly that acquisition once it completes (later sessions own their own)
+                acquire.add_done_callback(self._release_abandoned_write)
+                raise
+            try:
+                if self.coordinator.generation() != self._loaded_generation:
+                    await self._reload_index()
+                # Also picks up versions retired by a worker that exited before its grace period ended
+                await self._collect_retired()
+
+                version = self.index_version
+                try:
+                    yield
+                finally:
+                    if self.index_version != version:
+                        self._loaded_generation = self.coordinator.bump_generation()
+            finally:
+                self.coordinator.release_write(write_lock)
+
+    def _release_abandoned_write(self, acquire: asyncio.Future):
+        if not acquire.cancelled() and acquire.exception() is None:
+            self.coordinator.release_write(acquire.result())
+
+    async def maybe_reload(self):
+        """Pick up index changes published by another worker (checked at most once per interval)"""
+        now = time.monotonic()
+        if now - self._generation_checked_at < self.settings.index_reload_interval_ms / 1000:
+            return
+        self._generation_checked_at = now
+
+        # A local write session reloads on entry and publishes on exit
+        if self._index_lock.locked() or self.coordinator.generation() == self._loaded_generation:
+            return
+
+        async with self._index_lock:
+            generation = self.coordinator.generation()
+            if generation != self._loaded_generation:
+                await self._reload_index()
+
+    async def _reload_index(self):
+        """Reopen the active collection version and rebuild manifest and in-process indexes from disk"""
+        generation = self.coordinator.generation()
+        start = time.perf_counter()
+        client, active = await self._chroma_write(self._open_index)
+
+        # Swap everything at once so readers never mix two generations
+        self.chroma_client = client
+        self.active = active
+        self._loaded_generation = generation
+        # Another worker changed the content; answers cached against the old index are stale
+        self.index_version += 1
+        logger.info(
+            f"Reloaded index generation {generation} (collection {active.name}) in "
+            f"{(time.perf_counter() - start) * 1000:.0f} ms ({len(active.manifest)} files)"
+        )
+
+    def _open_index(self):
+        """Open a fresh Chroma client (its in-memory HNSW state is per process) and load the index"""
+        from chromadb.api.client import SharedSystemClient
+
+        # Chroma shares one System per path within a process; drop it so the segments are re-read
+        SharedSystemClient.clear_system_cache()
+        client = _open_chroma_client(self.settings.chroma_db_path)
+        return client, self._open_version(client, self.coordinator.read_alias()["active"])
+
+    def _collection_name(self, version: int) -> str:
+        # Version 0 is the unversioned collection of indexes created before rebuilds existed
+        return self.settings.collection_name if version == 0 else f"{self.settings.collection_name}_v{version}"
+
+    def _manifest_path(self, version: int) -> Path:
+        path = Path(self.settings.chroma_db_path) / self.settings.index_manifest_file
+        return path if version == 0 else path.with_name(f"{path.stem}.v{version}{path.suffix}")
+
+    def _open_version(self, client, version: int) -> "_CollectionVersion":
+        """Open (or create) a collection version with its manifest and in-process indexes"""
+        collection = client.get_or_create_collection(
+            name=self._collection_name(version),
+            metadata={"description": "RAG documents collection"}
+        )
+        manifest_path = self._manifest_path(version)
+        manifest, config = self._load_manifest(manifest_path)
+        lexical_index, vector_index = self._build_memory_indexes(collection)
+        return _CollectionVersion(
+            version,
+            collection,
+            manifest_path,
+            manifest,
+            manifest_current=config == self._index_config(),
+            embedding_model=config.get("embedding_model") if config else None,
+            lexical_index=lexical_index,
+            vector_index=vector_index
+        )
+
+    def _create_version(self, version: int) -> "_CollectionVersion":
+        """Create an empty collection version, dropping leftovers of an interrupted build"""
+        name = self._collection_name(version)
+        if name in {collection.name for collection in self.chroma_client.list_collections()}:
+            self.chroma_client.delete_collection(name)
+        self._manifest_path(version).unlink(missing_ok=True)
+        return self._open_version(self.chroma_client, version)
+
+    def _next_version(self) -> int:
+        alias = self.coordinator.read_alias()
+        return max([alias["active"], *(int(version) for version in alias["retired"])]) + 1
+
+    async def rebuild_index(self, progress: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Re-index the default documents folder from scratch into a new collection version
+        while queries keep being served from the active one, then switch over atomically.
+        Other writes wait for the rebuild; the replaced version is deleted after a grace period.
+        """
+        documents_folder = Path(self.settings.documents_folder)
+        file_patterns = [f"*{ext}" for ext in self.settings.supported_extensions]
+
+        progress = progress if progress is not None else {}
+        progress.update({"state": "waiting", "folder": str(documents_folder)})
+        self.sync_progress = progress
+
+        async with self._exclusive_index():
+            version = self._next_version()
+            shadow = await self._chroma_write(self._create_version, version)
+            self.building = {"version": version, "collection": shadow.name, "started_at": time.time(), "progress": progress}
+            logger.info(f"Rebuilding the index into {shadow.name}; {self.active.name} keeps serving")
+
+            try:
+                progress["state"] = "discovering"
+                valid_files = []
+                if documents_folder.exists():
+                    valid_files = await asyncio.get_event_loop().run_in_executor(
+                        self.executor, self._discover_files, documents_folder, file_patterns
+                    )
+                result = await self._apply_changes(shadow, valid_files, [], progress)
+            except BaseException:
+                await asyncio.shield(self._chroma_write(self._drop_version, version))
+                raise
+            finally:
+                self.building = None
+
+            await self._activate(shadow)
+
+        if not valid_files:
+            result["details"].append("No valid files found to process")
+        logger.info(f"Rebuilt the index as {shadow.name}: {result['processed_files']} files, {result['total_chunks']} chunks")
+        return result
+
+    async def _activate(self, version: "_CollectionVersion"):
+        """
+        Point the alias at a new collection version and serve it. The old version is retired,
+        not deleted: other workers may query it until they reload the new generation.
+        """
+        alias = self.coordinator.read_alias()
+        previous = alias["active"]
+        alias["retired"][str(previous)] = time.time()
+        alias["active"] = version.version
+        self.coordinator.write_alias(alias)
+
+        self.active = version
+        # Invalidates version-keyed caches and publishes a new generation on leaving the write session
+        self.index_version += 1
+        logger.info(f"Switched the active index to {version.name}; retired version {previous}")
+
+        if self._gc_task is None or self._gc_task.done():
+            self._gc_task = asyncio.create_task(self._collect_retired_later())
+
+    async def _collect_retired_later(self):
+        """Garbage-collect each retired version once its own grace period has passed"""
+        # One task serves every retirement: versions retired while it sleeps are picked up
+        # on the next pass instead of waiting for the next activation
+        while True:
+            retired = self.coordinator.read_alias()["retired"]
+            if not retired:
+                return
+            deadline = min(retired.values()) + self.settings.index_gc_grace_seconds
+            await asyncio.sleep(max(0.0, deadline - time.time()))
+            async with self._exclusive_index():
+                await self._collect_retired()
+
+    async def _collect_retired(self):
+        """Delete retired collection versions older than the grace period (call within a write session)"""
+        alias = self.coordinator.read_alias()
+        cutoff = time.time() - self.settings.index_gc_grace_seconds
+        expired = [version for version, retired_at in alias["retired"].items() if retired_at <= cutoff]
+        if not expired:
+            return
+
+        for version in expired:
+            if int(version) != alias["active"]:
+                await self._chroma_write(self._drop_version, int(version))
+            del alias["retired"][version]
+        self.coordinator.write_alias(alias)
+        logger.info(f"Garbage-collected retired index versions {', '.join(expired)}")
+
+    def _drop_version(self, version: int):
+        """Delete a collection version and its manifest"""
+        name = self._collection_name(version)
+        if name in {collection.name for collection in self.chroma_client.list_collections()}:
+            self.chroma_client.delete_collection(name)
+        self._manifest_path(version).unlink(missing_ok=True)
+
+    async def embed_query(self, query: str, stats: Optional[Dict[str, Any]] = None) -> List[float]:
+        """
+        Embed a query, serving repeated questions from the LRU cache.
+        If `stats` is given, cache hit and timing information is written into it.
+        """
+        key = " ".join(query.lower().split())
+        start = time.perf_counter()
+
+        query_embedding = self.query_embedding_cache.get(key)
+        cache_hit = query_embedding is not None
+
+        if cache_hit:
+            # A hit saves roughly one average forward pass
+            saved_ms = self._query_embedding_ms_avg
+            self._query_embedding_saved_ms += saved_ms
+            metrics.QUERY_EMBEDDING_CACHE_HITS.inc()
+        else:
+            metrics.QUERY_EMBEDDING_CACHE_MISSES.inc()
+            query_embedding = await self.query_batcher.embed(query)
+            self.query_embedding_cache.set(key, query_embedding)
+            saved_ms = 0.0
+
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if self._query_embedding_ms_avg:
+                self._query_embedding_ms_avg = 0.9 * self._query_embedding_ms_avg + 0.1 * elapsed_ms
+            else:
+                self._query_embedding_ms_avg = elapsed_ms
+
+        metrics.QUERY_EMBEDDING_SECONDS.observe(time.perf_counter() - start)
+        if stats is not None:
+            stats.update({
+                "query_embedding_ms": round((time.perf_counter() - start) * 1000, 2),
+                "query_embedding_cache_hit": cache_hit,
+                "query_embedding_cache_hit_rate": round(self.query_embedding_cache.hit_rate, 4),
+                "query_embedding_saved_ms": round(saved_ms, 2)
+            })
+
+        return query_embedding
+
+    async def search_similar_documents(
+        self,
+        query: str,
+        k: int = None,
+        stats: Optional[Dict[str, Any]] = None,
+        query_embedding: Optional[List[float]] = None
+    ) -> List[Dict[str, Any]]:
+        """Search for similar documents; pass `query_embedding` if the caller already embedded the query"""
         if k is None:
             k = self.settings.retrieval_k
 
+        # Over-fetch when a rerank stage narrows the candidates down afterwards
+        fetch_k = max(k, self.settings.rerank_candidates) if self.reranker is not None else k
+
+        # Serve the latest index generation published by any worker
+        await self.maybe_reload()
+        # One collection version for the whole query, even if a rebuild switches over meanwhile
+        active = self.active
+
         # Generate query embedding
-        loop = asyncio.get_event_loop()
-        query_embedding = await loop.run_in_executor(
-            self.executor,
-            self.embeddings.embed_query,
-            query
-        )
+        if query_embedding is None:
+            query_embedding = await self.embed_query(query, stats)
+
+        if active.lexical_index is None:
+            similar_docs = await self._dense_search(query_embedding, fetch_k, stats, active)
+        else:
+            # Hybrid: over-fetch from both retrievers and fuse by reciprocal rank
+            candidates = max(fetch_k, self.settings.hybrid_candidates)
+            dense_docs = await self._dense_search(query_embedding, candidates, stats, active)
+
+            start = time.perf_counter()
+            lexical_docs = active.lexical_index.search(query, candidates)
+            elapsed = time.perf_counter() - start
+            metrics.LEXICAL_SEARCH_SECONDS.observe(elapsed)
+            if stats is not None:
+                stats["lexical_ms"] = round(elapsed * 1000, 3)
+
+            similar_docs = reciprocal_rank_fusion([dense_docs, lexical_docs], fetch_k, self.settings.rrf_k)
+
+        if self.reranker is not None:
+            start = time.perf_counter()
+            similar_docs = await self.reranker.rerank(query, similar_docs, k, stats)
+            metrics.RERANK_SECONDS.observe(time.perf_counter() - start)
 
+        return similar_docs
+
+    async def _dense_search(
+        self,
+        query_embedding: List[float],
+        k: int,
+        stats: Optional[Dict[str, Any]] = None,
+        active: Optional["_CollectionVersion"] = None
+    ) -> List[Dict[str, Any]]:
+        """Nearest-neighbour search, in process for small corpora and in ChromaDB otherwise"""
+        active = active or self.active
+        if active.vector_index is not None and 0 < len(active.vector_index) <= self.settings.vector_index_max_chunks:
+            start = time.perf_counter()
+            similar_docs = active.vector_index.search(query_embedding, k)
+            elapsed = time.perf_counter() - start
+            metrics.VECTOR_INDEX_QUERY_SECONDS.observe(elapsed)
+            if stats is not None:
+                stats["dense_backend"] = "vector_index"
+                stats["dense_ms"] = round(elapsed * 1000, 3)
+            return similar_docs
+
+        start = time.perf_counter()
         # Search in ChromaDB
-        results = self.collection.query(
+        results = await self._chroma_read(
+            active.collection.query,
             query_embeddings=[query_embedding],
             n_results=k,
             include=["documents", "metadatas", "distances"]
@@ -252,33 +1109,70 @@ class DocumentService:
         # Format results
         similar_docs = []
         if results.get("documents") and results["documents"][0]:
-            for i, (doc, metadata, distance) in enumerate(zip(
+            for i, (doc_id, doc, metadata, distance) in enumerate(zip(
+                results["ids"][0],
                 results["documents"][0],
                 results["metadatas"][0],
                 results["distances"][0]
             )):
                 similar_docs.append({
+                    "id": doc_id,
                     "content": doc,
                     "metadata": metadata,
                     "score": 1 - distance,   # Convert distance to similarity score
                     "rank": i + 1
                 })
 
+        elapsed = time.perf_counter() - start
+        metrics.CHROMA_QUERY_SECONDS.observe(elapsed)
+        if stats is not None:
+            stats["dense_backend"] = "chroma"
+            stats["dense_ms"] = round(elapsed * 1000, 3)
         return similar_docs
 
     async def get_status(self) -> Dict[str, Any]:
         """Get status of the document database"""
+        active = self.active
         try:
-            count = self.collection.count()
+            count = await self._chroma_read(active.collection.count)
+            building = None
+            if self.building is not None:
+                progress = self.building["progress"]
+                building = {
+                    "version": self.building["version"],
+                    "collection": self.building["collection"],
+                    "started_at": self.building["started_at"],
+                    "state": progress.get("state"),
+                    "files_to_process": progress.get("files_to_process"),
+                    "files_added": progress.get("files_added"),
+                    "chunks_added": progress.get("chunks_added")
+                }
             return {
-                "collection_name": self.settings.collection_name,
+                "collection_name": active.name,
+                "collection_versions": {
+                    "active": active.version,
+                    "building": building,
+                    "retired": sorted(int(version) for version in self.coordinator.read_alias()["retired"])
+                },
                 "document_count": count,
-                "status": "healthy" if count > 0 else "empty"
+                "status": "healthy" if count > 0 else "empty",
+                "embedding_backend": self.embeddings.cache_key,
+                "embedding_cache": self.embedding_cache.stats() if self.embedding_cache else None,
+                "query_embedding_cache": {
+                    **self.query_embedding_cache.stats(),
+                    "saved_ms_total": round(self._query_embedding_saved_ms, 2)
+                },
+                "query_batching": self.query_batcher.stats(),
+                "lexical_index_chunks": len(active.lexical_index) if active.lexical_index is not None else None,
+                "vector_index": active.vector_index.stats() if active.vector_index is not None else None,
+                "index_generation": self._loaded_generation,
+                "ingestion_leader": self.coordinator.is_leader,
+                "rerank_score_cache": self.reranker.score_cache.stats() if self.reranker is not None else None
             }
         except Exception as e:
             logger.error(f"Error getting database status: {e}")
             return {
-                "collection_name": self.settings.collection_name,
+                "collection_name": active.name,
                 "document_count": 0,
                 "status": "error",
                 "error": str(e)
@@ -286,20 +1180,112 @@ class DocumentService:
 
     async def clear_database(self):
         """Clear all documents from the database"""
-        try:
-            # Delete and recreate the collection
-            self.chroma_client.delete_collection(self.settings.collection_name)
-            self.collection = self.chroma_client.create_collection(
-                name=self.settings.collection_name,
-                metadata={"description": "RAG documents collection"}
-            )
-            logger.info("ChromaDB collection cleared and recreated successfully.")
-        except Exception as e:
-            logger.error(f"Error clearing database: {str(e)}")
-            raise
+        async with self._exclusive_index():
+            try:
+                # Switch to a new empty version; the old one is deleted after the grace period
+                await self._activate(await self._chroma_write(self._create_version, self._next_version()))
+                logger.info("ChromaDB collection cleared successfully.")
+            except Exception as e:
+                logger.error(f"Error clearing database: {str(e)}")
+                raise
 
     async def cleanup(self):
         """Cleanup resources"""
+        if self._gc_task is not None:
+            # Retired versions are collected by a later write session instead
+            self._gc_task.cancel()
+            await asyncio.gather(self._gc_task, return_exceptions=True)
         if hasattr(self, 'executor'):
             self.executor.shutdown(wait=True)
+            self.chroma_read_executor.shutdown(wait=True)
+            self.chroma_write_executor.shutdown(wait=True)
             logger.info("Executor shutdown completed.")
+        if self.parse_pool is not None:
+            self.parse_pool.shutdown(wait=True)
+        if self.embedding_cache is not None:
+            self.embedding_cache.close()
+        self.coordinator.close()
+
+
+class _FileDone(NamedTuple):
+    """Pipeline marker emitted after the last chunk of a file"""
+    file_path: Path
+    stat: os.stat_result
+    content_hash: str
+
+
+_END_OF_STREAM = object()
+
+
+class _CollectionVersion:
+    """One version of the indexed corpus: a Chroma collection, its manifest and in-process indexes"""
+
+    def __init__(
+        self,
+        version: int,
+        collection,
+        manifest_path: Path,
+        manifest: Dict[str, Dict[str, Any]],
+        manifest_current: bool,
+        embedding_model: Optional[str],
+        lexical_index: Optional[LexicalIndex],
+        vector_index: Optional[VectorIndex]
+    ):
+        self.version = version
+        self.collection = collection
+        # Per-file manifest of what is indexed (path -> size, mtime, hash, chunk IDs)
+        self.manifest_path = manifest_path
+        self.manifest = manifest
+        # False when the stored manifest was unreadable or built with other settings
+        self.manifest_current = manifest_current
+        # Model the stored vectors were embedded with (None if unknown)
+        self.embedding_model = embedding_model
+        self.lexical_index = lexical_index
+        self.vector_index = vector_index
+
+    @property
+    def name(self) -> str:
+        return self.collection.name
+
+
+def _open_chroma_client(path: str):
+    """Open the persistent Chroma client; chromadb is imported here because it is slow to import"""
+    import chromadb
+    from chromadb.config import Settings as ChromaSettings
+
+    return chromadb.PersistentClient(path=path, settings=ChromaSettings(anonymized_telemetry=False))
+
+
+def chunk_id(source: str, chunk_index: int, text: str) -> str:
+    """Stable chunk ID derived from the source path, position and content"""
+    digest = hashlib.sha256(f"{source}\x00{chunk_index}\x00{text}".encode("utf-8"))
+    return f"chunk_{digest.hexdigest()[:32]}"
+
+
+def _hash_file(file_path: Path) -> str:
+    """Compute the SHA-256 hex digest of a file's content"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _stat_files(files: List[Path]) -> List[Optional[os.stat_result]]:
+    """stat() each file, with None for files that no longer exist"""
+    stats = []
+    for file_path in files:
+        try:
+            stats.append(file_path.stat())
+        except FileNotFoundError:
+            stats.append(None)
+    return stats
+
+
+def _write_manifest(manifest_path: Path, data: Dict[str, Any]):
+    """Write a manifest to a temporary file and rename it over the old one"""
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = manifest_path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, manifest_path)
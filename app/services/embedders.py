@@ -0,0 +1,279 @@
+import base64
+import logging
+import time
+from abc import ABC, abstractmethod
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from app.core.config import Settings
+
+logger = logging.getLogger(__name__)
+
+# all-mpnet-base-v2 was trained with 384-token inputs
+MAX_SEQ_LENGTH = 384
+
+
+class Embedder(ABC):
+    """Text embedding backend used for both chunks and queries"""
+
+    model_name: str
+    backend: str
+
+    @property
+    def cache_key(self) -> str:
+        """Identifies the vectors this embedder produces (cache and manifest key)"""
+        if self.backend == "huggingface":
+            return self.model_name
+        return f"{self.model_name}#{self.backend}"
+
+    @abstractmethod
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed a batch of texts"""
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query"""
+        return self.embed_documents([text])[0]
+
+
+class HuggingFaceEmbedder(Embedder):
+    """Full-precision PyTorch sentence-transformers model (the original backend)"""
+
+    backend = "huggingface"
+
+    def __init__(self, model_name: str, threads: int = 0):
+        from langchain_community.embeddings import HuggingFaceEmbeddings
+
+        _set_torch_threads(threads)
+        self.model_name = model_name
+        self._model = HuggingFaceEmbeddings(model_name=model_name, model_kwargs={'device': 'cpu'})
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._model.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._model.embed_query(text)
+
+
+class QuantizedTorchEmbedder(Embedder):
+    """sentence-transformers model with int8 dynamic quantization of its Linear layers"""
+
+    backend = "torch-int8"
+
+    def __init__(self, model_name: str, threads: int = 0, batch_size: int = 32):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        _set_torch_threads(threads)
+        self.model_name = model_name
+        self.batch_size = batch_size
+        model = SentenceTransformer(model_name, device="cpu")
+        self._model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        texts = [text.replace("\n", " ") for text in texts]
+        vectors = self._model.encode(
+            texts,
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+        return vectors.tolist()
+
+
+class OnnxEmbedder(Embedder):
+    """
+    ONNX Runtime CPU backend with mean pooling and L2 normalization (as in all-mpnet-base-v2).
+    The model is exported from the Hugging Face checkpoint on first use and optionally
+    int8-quantized with onnxruntime's dynamic quantization.
+    """
+
+    backend = "onnx"
+
+    def __init__(
+        self,
+        model_name: str,
+        model_dir: str,
+        threads: int = 0,
+        quantize: bool = True,
+        batch_size: int = 32
+    ):
+        try:
+            import onnxruntime as ort
+            from transformers import AutoTokenizer
+        except ImportError as e:
+            raise ValueError(
+                "The 'onnx' embedding backend requires onnxruntime (pip install onnxruntime)"
+            ) from e
+
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.quantize = quantize
+        if quantize:
+            self.backend = "onnx-int8"
+
+        path = Path(model_dir)
+        model_file = path / ("model_int8.onnx" if quantize else "model.onnx")
+        if not model_file.exists():
+            self._export(path, quantize)
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self._session = ort.InferenceSession(str(model_file), options, providers=["CPUExecutionProvider"])
+        self._tokenizer = AutoTokenizer.from_pretrained(str(path))
+
+    def _export(self, path: Path, quantize: bool):
+        """Export the transformer to ONNX (and an int8 copy) next to its tokenizer"""
+        import torch
+        from transformers import AutoModel, AutoTokenizer
+
+        path.mkdir(parents=True, exist_ok=True)
+        onnx_file = path / "model.onnx"
+        if not onnx_file.exists():
+            logger.info(f"Exporting {self.model_name} to ONNX in {path}")
+            tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+            model = AutoModel.from_pretrained(self.model_name).eval()
+            sample = tokenizer(["export sample"], return_tensors="pt")
+            torch.onnx.export(
+                model,
+                (sample["input_ids"], sample["attention_mask"]),
+                str(onnx_file),
+                input_names=["input_ids", "attention_mask"],
+                output_names=["last_hidden_state"],
+                dynamic_axes={
+                    "input_ids": {0: "batch", 1: "sequence"},
+                    "attention_mask": {0: "batch", 1: "sequence"},
+                    "last_hidden_state": {0: "batch", 1: "sequence"}
+                },
+                opset_version=14
+            )
+            tokenizer.save_pretrained(str(path))
+
+        if quantize:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            logger.info("Quantizing ONNX embedding model to int8")
+            quantize_dynamic(str(onnx_file), str(path / "model_int8.onnx"), weight_type=QuantType.QInt8)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = [text.replace("\n", " ") for text in texts[start:start + self.batch_size]]
+            encoded = self._tokenizer(
+                batch,
+                padding=True,
+                truncation=True,
+                max_length=MAX_SEQ_LENGTH,
+                return_tensors="np"
+            )
+            mask = encoded["attention_mask"].astype(np.int64)
+            hidden = self._session.run(None, {
+                "input_ids": encoded["input_ids"].astype(np.int64),
+                "attention_mask": mask
+            })[0]
+
+            # Mean pooling over real tokens, then L2 normalization
+            weights = mask[..., None].astype(np.float32)
+            pooled = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            vectors.extend(pooled.tolist())
+        return vectors
+
+
+class RemoteEmbedder(Embedder):
+    """
+    Client of the shared embedding sidecar (app.embedding_server), so several API workers
+    use one loaded model. It reports the sidecar's model and backend, so caches and the
+    index manifest stay keyed by the vectors actually produced.
+    """
+
+    backend = "remote"
+
+    def __init__(self, url: str, timeout: float = 60.0, wait_seconds: float = 120.0, batch_size: int = 256):
+        import httpx
+
+        self.url = url.rstrip("/")
+        self.batch_size = batch_size
+        self._client = httpx.Client(base_url=self.url, timeout=timeout)
+
+        info = self._wait_for_service(wait_seconds)
+        self.model_name = info["model"]
+        self.backend = info["backend"]
+        self._cache_key = info["cache_key"]
+        logger.info(f"Using embedding service at {self.url} ({self._cache_key})")
+
+    @property
+    def cache_key(self) -> str:
+        return self._cache_key
+
+    def _wait_for_service(self, wait_seconds: float) -> Dict[str, Any]:
+        """Poll the sidecar until its model is loaded"""
+        import httpx
+
+        deadline = time.monotonic() + wait_seconds
+        while True:
+            try:
+                response = self._client.get("/info")
+                response.raise_for_status()
+                return response.json()
+            except httpx.HTTPError as e:
+                if time.monotonic() > deadline:
+                    raise ValueError(f"Embedding service at {self.url} is not reachable: {e}") from e
+                time.sleep(0.5)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            response = self._client.post("/embed", json={"texts": texts[start:start + self.batch_size]})
+            response.raise_for_status()
+            vectors.extend(decode_vectors(response.json()))
+        return vectors
+
+
+def encode_vectors(vectors: List[List[float]]) -> Dict[str, Any]:
+    """Pack vectors as base64 float32, much smaller and faster to parse than JSON floats"""
+    dimension = len(vectors[0]) if vectors else 0
+    flat = array("f")
+    for vector in vectors:
+        flat.extend(vector)
+    return {"count": len(vectors), "dimension": dimension, "data": base64.b64encode(flat.tobytes()).decode("ascii")}
+
+
+def decode_vectors(payload: Dict[str, Any]) -> List[List[float]]:
+    """Inverse of encode_vectors"""
+    flat = array("f")
+    flat.frombytes(base64.b64decode(payload["data"]))
+    dimension = payload["dimension"]
+    return [flat[i * dimension:(i + 1) * dimension].tolist() for i in range(payload["count"])]
+
+
+def _set_torch_threads(threads: int):
+    if threads > 0:
+        import torch
+
+        torch.set_num_threads(threads)
+
+
+def build_embedder(settings: Settings) -> Embedder:
+    """Create the embedding backend selected in settings"""
+    backend = settings.embedding_backend.lower()
+    logger.info(f"Loading {settings.embedding_model} with the '{backend}' embedding backend")
+
+    if backend == "huggingface":
+        return HuggingFaceEmbedder(settings.embedding_model, threads=settings.embedding_threads)
+    if backend == "torch-int8":
+        return QuantizedTorchEmbedder(settings.embedding_model, threads=settings.embedding_threads)
+    if backend == "onnx":
+        return OnnxEmbedder(
+            settings.embedding_model,
+            model_dir=settings.embedding_onnx_dir,
+            threads=settings.embedding_threads,
+            quantize=settings.embedding_onnx_quantize
+        )
+    if backend == "remote":
+        return RemoteEmbedder(settings.embedding_service_url, timeout=settings.embedding_service_timeout)
+    raise ValueError(f"Unknown embedding backend: {settings.embedding_backend}")
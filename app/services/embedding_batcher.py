@@ -0,0 +1,96 @@
+import asyncio
+import logging
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class QueryEmbeddingBatcher:
+    """
+    Collects query embeddings requested by concurrent coroutines into batched
+    forward passes. A batch is flushed when `max_batch_size` queries are waiting
+    or `window_ms` after the first one arrived. Only one batch runs at a time;
+    queries that arrive meanwhile form the next batch.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], List[List[float]]],
+        executor: Executor,
+        window_ms: float = 5.0,
+        max_batch_size: int = 32
+    ):
+        self.embed_fn = embed_fn
+        self.executor = executor
+        self.window_ms = window_ms
+        self.max_batch_size = max(1, max_batch_size)
+
+        self.batches = 0
+        self.batched_queries = 0
+
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._running = False
+
+    async def embed(self, text: str) -> List[float]:
+        """Embed a single query as part of the next batch"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window_ms / 1000, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """Start a batch with the queued queries unless one is already running"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if self._running or not self._pending:
+            return
+
+        batch = self._pending[:self.max_batch_size]
+        self._pending = self._pending[self.max_batch_size:]
+        self._running = True
+        asyncio.ensure_future(self._run_batch(batch))
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]):
+        """Embed one batch in the executor and fan the vectors back out"""
+        # Identical questions in the same window share one row of the batch
+        texts = list(dict.fromkeys(text for text, _ in batch))
+
+        try:
+            loop = asyncio.get_running_loop()
+            vectors = await loop.run_in_executor(self.executor, self.embed_fn, texts)
+            by_text = dict(zip(texts, vectors))
+            for text, future in batch:
+                if not future.done():
+                    future.set_result(by_text[text])
+        except Exception as e:
+            logger.error(f"Error embedding query batch of {len(texts)}: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self.batches += 1
+            self.batched_queries += len(batch)
+            self._running = False
+            # Whatever queued up while this batch was running goes next
+            if self._pending:
+                self._flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """Batch counters"""
+        return {
+            "batches": self.batches,
+            "queries": self.batched_queries,
+            "avg_batch_size": round(self.batched_queries / self.batches, 2) if self.batches else 0.0,
+            "window_ms": self.window_ms,
+            "max_batch_size": self.max_batch_size
+        }
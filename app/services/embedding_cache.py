@@ -0,0 +1,140 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text before hashing so trivially different copies share a cache entry"""
+    return unicodedata.normalize("NFC", text).strip()
+
+
+def text_hash(text: str) -> str:
+    """SHA-256 hex digest of the normalized text"""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Persistent SQLite cache of embeddings keyed by (model name, normalized text hash)"""
+
+    def __init__(self, path: str, model_name: str, max_entries: int = 100000):
+        self.path = Path(path)
+        self.model_name = model_name
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+
+    def get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Look up embeddings for texts, returning None for every miss"""
+        hashes = [text_hash(text) for text in texts]
+        found: Dict[str, List[float]] = {}
+
+        with self._lock:
+            unique = list(dict.fromkeys(hashes))
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(unique), 500):
+                batch = unique[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [self.model_name, *batch]
+                ).fetchall()
+                for key, blob in rows:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    found[key] = vector.tolist()
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, self.model_name, key) for key in found]
+                )
+                self._conn.commit()
+
+            results = [found.get(key) for key in hashes]
+            hit_count = sum(1 for vector in results if vector is not None)
+            self.hits += hit_count
+            self.misses += len(results) - hit_count
+
+        return results
+
+    def put_many(self, texts: List[str], vectors: List[List[float]]):
+        """Store embeddings and evict the least recently used entries above the size bound"""
+        if not texts:
+            return
+
+        now = time.time()
+        rows = [
+            (self.model_name, text_hash(text), array("f", vector).tobytes(), now)
+            for text, vector in zip(texts, vectors)
+        ]
+
+        with self._lock:
+            # Several workers can share the cache file, so the size is counted in the transaction
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO embeddings (model, text_hash, vector, last_used) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                overflow = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] - self.max_entries
+                if overflow > 0:
+                    self._conn.execute(
+                        "DELETE FROM embeddings WHERE rowid IN "
+                        "(SELECT rowid FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                        (overflow,)
+                    )
+                    self.evictions += overflow
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        return {
+            "model": self.model_name,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+    def close(self):
+        """Close the underlying SQLite connection"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,204 @@
+import asyncio
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.services.ingestion_jobs import IngestionJobManager, JobQueueFullError
+
+logger = logging.getLogger(__name__)
+
+
+class FolderWatcher:
+    """
+    Keeps the index in step with a folder without full refreshes.
+    - Change events come from watchfiles (inotify on Linux) or, when that is unavailable
+      or fails, from periodically diffing a stat snapshot of the folder.
+    - Events are collected until the folder has been quiet for `debounce_ms`, so a burst
+      of writes (an editor save, a `git pull`) becomes one batch.
+    - Batches of at most `max_files_per_batch` paths are submitted as ingestion jobs, one at
+      a time and no more often than every `min_batch_interval_seconds`, which bounds how much
+      embedding work the watcher can take away from chat requests.
+    """
+
+    def __init__(
+        self,
+        folder: str,
+        job_manager: IngestionJobManager,
+        supported_extensions: List[str],
+        backend: str = "auto",
+        poll_interval_ms: int = 2000,
+        debounce_ms: int = 1000,
+        max_files_per_batch: int = 32,
+        min_batch_interval_seconds: float = 2.0
+    ):
+        self.folder = Path(folder)
+        self.job_manager = job_manager
+        self.supported_extensions = {ext.lower() for ext in supported_extensions}
+        self.backend = backend.lower()
+        self.poll_interval = poll_interval_ms / 1000
+        self.debounce = debounce_ms / 1000
+        self.max_files_per_batch = max(1, max_files_per_batch)
+        self.min_batch_interval = min_batch_interval_seconds
+
+        # Events report absolute paths; the manifest is keyed by paths under `folder` as configured
+        self._root = self.folder.resolve()
+        # Insertion-ordered set of paths waiting to be re-indexed
+        self._pending: Dict[Path, None] = {}
+        self._changed = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._first_event_at: Optional[float] = None
+        self._last_event_at = 0.0
+        self._last_batch_at = 0.0
+        self._tasks: List[asyncio.Task] = []
+
+        self.backend_in_use: Optional[str] = None
+        self.events = 0
+        self.batches = 0
+        self.files_submitted = 0
+
+    def start(self):
+        """Start watching and dispatching in background tasks"""
+        self._tasks = [asyncio.create_task(self._watch()), asyncio.create_task(self._dispatch())]
+        logger.info(f"Watching {self.folder} for changes")
+
+    async def stop(self):
+        """Stop watching; a batch already submitted as a job is left to the job manager"""
+        self._stop.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "folder": str(self.folder),
+            "backend": self.backend_in_use,
+            "events": self.events,
+            "batches": self.batches,
+            "files_submitted": self.files_submitted,
+            "pending_paths": len(self._pending)
+        }
+
+    async def _watch(self):
+        if self.backend != "poll":
+            try:
+                from watchfiles import awatch
+            except ImportError:
+                logger.warning("watchfiles is not installed; polling the documents folder instead")
+            else:
+                try:
+                    self.backend_in_use = "native"
+                    async for changes in awatch(
+                        self.folder,
+                        debounce=max(1, int(self.debounce * 1000)),
+                        stop_event=self._stop
+                    ):
+                        self._add(Path(path) for _, path in changes)
+                    return
+                except OSError as e:
+                    # e.g. the inotify watch limit, or a filesystem that does not deliver events
+                    logger.warning(f"Native file watching failed ({str(e)}); polling {self.folder} instead")
+
+        self.backend_in_use = "poll"
+        await self._poll()
+
+    async def _poll(self):
+        """Diff (size, mtime) snapshots of the folder every poll interval"""
+        snapshot = await asyncio.to_thread(self._scan)
+        while not self._stop.is_set():
+            await asyncio.sleep(self.poll_interval)
+            current = await asyncio.to_thread(self._scan)
+            changed = [
+                path for path in snapshot.keys() | current.keys()
+                if snapshot.get(path) != current.get(path)
+            ]
+            if changed:
+                self._add(changed)
+            snapshot = current
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        snapshot = {}
+        for directory, _, file_names in os.walk(self.folder):
+            for file_name in file_names:
+                path = Path(directory, file_name)
+                if path.suffix.lower() not in self.supported_extensions:
+                    continue
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                snapshot[path] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def _add(self, paths: Iterable[Path]):
+        loop = asyncio.get_running_loop()
+        for path in paths:
+            path = self._relative_to_folder(path)
+            if path is None or not self._is_relevant(path):
+                continue
+            self._pending[path] = None
+            self.events += 1
+            self._last_event_at = loop.time()
+            if self._first_event_at is None:
+                self._first_event_at = self._last_event_at
+            self._changed.set()
+
+    def _relative_to_folder(self, path: Path) -> Optional[Path]:
+        if not path.is_absolute():
+            return path
+        try:
+            return self.folder / path.relative_to(self._root)
+        except ValueError:
+            return None
+
+    def _is_relevant(self, path: Path) -> bool:
+        """Supported files, directories, and deleted paths that may have been directories"""
+        if path.suffix.lower() in self.supported_extensions:
+            return True
+        if path.exists():
+            return path.is_dir()
+        return path.suffix == ""
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._changed.wait()
+
+            # Debounce: wait for a quiet period, but not forever if something writes continuously
+            while True:
+                now = loop.time()
+                quiet_until = self._last_event_at + self.debounce
+                deadline = self._first_event_at + self.debounce * 10
+                if now >= min(quiet_until, deadline):
+                    break
+                await asyncio.sleep(min(quiet_until, deadline) - now)
+
+            # Rate limit: at most one batch per interval
+            wait = self._last_batch_at + self.min_batch_interval - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            batch = list(self._pending)[:self.max_files_per_batch]
+            try:
+                job = self.job_manager.submit_paths(batch)
+            except JobQueueFullError:
+                # Ingestion is saturated by other jobs; keep the paths and retry later
+                self._last_batch_at = loop.time()
+                continue
+
+            for path in batch:
+                self._pending.pop(path, None)
+            if not self._pending:
+                self._changed.clear()
+                self._first_event_at = None
+            else:
+                self._first_event_at = loop.time()
+
+            self.batches += 1
+            self.files_submitted += len(batch)
+            logger.info(f"Folder watcher submitted {len(batch)} changed paths as job {job.id}")
+
+            # One watcher batch in flight at a time
+            await self.job_manager.wait(job)
+            self._last_batch_at = loop.time()
@@ -0,0 +1,113 @@
+import json
+import logging
+import os
+from pathlib import Path
+from typing import IO, Any, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, only single-process serving is supported
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class IndexCoordinator:
+    """
+    Coordinates index writers across worker processes sharing one Chroma directory.
+    - One process holds the ingestion leader lock for its lifetime and runs startup ingestion.
+    - Every write session (sync, reset, clear) holds the write lock, so writers never overlap.
+    - After a write session the generation counter is bumped; readers compare it with the
+      generation they loaded and reload their view of the index when it moved.
+    - The alias file names the collection version readers should serve and the retired
+      versions waiting to be garbage-collected.
+    """
+
+    def __init__(self, data_dir: str):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.generation_path = self.data_dir / "index_generation"
+        self.alias_path = self.data_dir / "index_alias.json"
+        self.is_leader = False
+
+        self._leader_file: Optional[IO] = None
+
+    def try_become_leader(self) -> bool:
+        """Take the ingestion leader lock if no other process holds it"""
+        if self.is_leader:
+            return True
+
+        if fcntl is not None:
+            leader_file = open(self.data_dir / "ingest_leader.lock", "a+")
+            try:
+                fcntl.flock(leader_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                leader_file.close()
+                return False
+            leader_file.seek(0)
+            leader_file.truncate()
+            leader_file.write(str(os.getpid()))
+            leader_file.flush()
+            self._leader_file = leader_file
+
+        self.is_leader = True
+        logger.info(f"Process {os.getpid()} is the ingestion leader")
+        return True
+
+    def acquire_write(self) -> Optional[IO]:
+        """
+        Block until the write lock is held (call from a worker thread) and return the handle
+        that owns it. Each acquisition opens its own file, so flock excludes sessions within
+        this process too and a handle can only release the acquisition it came from.
+        """
+        if fcntl is None:
+            return None
+        write_file = open(self.data_dir / "index_write.lock", "a+")
+        try:
+            fcntl.flock(write_file, fcntl.LOCK_EX)
+        except BaseException:
+            write_file.close()
+            raise
+        return write_file
+
+    def release_write(self, write_file: Optional[IO]):
+        """Release the write lock taken by acquire_write"""
+        if write_file is not None:
+            fcntl.flock(write_file, fcntl.LOCK_UN)
+            write_file.close()
+
+    def generation(self) -> int:
+        """Current index generation (0 before the first write session)"""
+        try:
+            return int(self.generation_path.read_text().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def bump_generation(self) -> int:
+        """Publish a finished write session; must be called while holding the write lock"""
+        generation = self.generation() + 1
+        tmp_path = self.generation_path.with_name(f"{self.generation_path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(str(generation))
+        os.replace(tmp_path, self.generation_path)
+        return generation
+
+    def read_alias(self) -> Dict[str, Any]:
+        """Active collection version and retired versions (version 0 is the unversioned collection)"""
+        try:
+            alias = json.loads(self.alias_path.read_text())
+        except (FileNotFoundError, ValueError):
+            alias = {}
+        return {"active": int(alias.get("active", 0)), "retired": dict(alias.get("retired", {}))}
+
+    def write_alias(self, alias: Dict[str, Any]):
+        """Replace the alias atomically; must be called while holding the write lock"""
+        tmp_path = self.alias_path.with_name(f"{self.alias_path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(alias))
+        os.replace(tmp_path, self.alias_path)
+
+    def close(self):
+        """Release the leader lock (write locks are released by their sessions)"""
+        if self._leader_file is not None:
+            self._leader_file.close()
+        self._leader_file = None
+        self.is_leader = False
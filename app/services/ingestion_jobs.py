@@ -0,0 +1,224 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.services.document_service import DocumentService
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobQueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at its limit"""
+
+
+class IngestionJob:
+    """One refresh or folder ingestion run and its progress counters"""
+
+    def __init__(
+        self,
+        kind: str,
+        folder: Optional[str],
+        file_patterns: Optional[List[str]],
+        paths: Optional[List[Path]] = None
+    ):
+        self.id = str(uuid.uuid4())
+        self.kind = kind
+        self.folder = folder
+        self.file_patterns = file_patterns
+        self.paths = paths
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        # Filled in by DocumentService.sync_documents while the job runs
+        self.progress: Dict[str, Any] = {}
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Status, counters, throughput and ETA as reported by the jobs API"""
+        progress = self.progress
+        files_to_process = progress.get("files_to_process", 0)
+        files_done = progress.get("files_added", 0) + progress.get("files_failed", 0)
+
+        # Throughput is measured from the start of the pipeline, after discovery
+        pipeline_started = progress.get("started_at")
+        elapsed = None
+        files_per_second = chunks_per_second = eta_seconds = None
+        if pipeline_started is not None:
+            elapsed = (self.finished_at or time.time()) - pipeline_started
+            if elapsed > 0:
+                files_per_second = round(files_done / elapsed, 2)
+                chunks_per_second = round(progress.get("chunks_added", 0) / elapsed, 2)
+            if self.status == RUNNING and files_per_second:
+                eta_seconds = round((files_to_process - files_done) / files_per_second, 1)
+
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "folder": self.folder or progress.get("folder"),
+            "status": self.status,
+            "phase": progress.get("state", "queued"),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "files_discovered": progress.get("files_discovered", 0),
+            "files_unchanged": progress.get("files_unchanged", 0),
+            "files_to_process": files_to_process,
+            "files_parsed": progress.get("files_parsed", 0),
+            "files_embedded": progress.get("files_embedded", 0),
+            "files_added": progress.get("files_added", 0),
+            "files_failed": progress.get("files_failed", 0),
+            "files_deleted": progress.get("files_deleted", 0),
+            "chunks_embedded": progress.get("chunks_embedded", 0),
+            "chunks_added": progress.get("chunks_added", 0),
+            "elapsed_seconds": round(elapsed, 2) if elapsed is not None else None,
+            "files_per_second": files_per_second,
+            "chunks_per_second": chunks_per_second,
+            "eta_seconds": eta_seconds,
+            "result": self.result,
+            "error": self.error
+        }
+
+
+class IngestionJobManager:
+    """
+    Runs ingestion in the background, at most `max_concurrent` jobs at a time.
+    Submissions beyond `max_queued` waiting jobs are rejected instead of piling up,
+    and the last `history` finished jobs are kept so clients can poll their outcome.
+    Jobs live in this process only: with several workers, a job can be polled or cancelled
+    only through the worker that accepted it (run one worker or route jobs stickily).
+    """
+
+    def __init__(self, document_service: DocumentService, max_concurrent: int, max_queued: int, history: int):
+        self.document_service = document_service
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queued = max_queued
+        self.history = history
+
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+
+    def submit_refresh(self, rebuild: bool = False) -> IngestionJob:
+        """
+        Queue an incremental sync of the default documents folder, or with `rebuild` a full
+        re-index into a new collection version that replaces the active one when complete
+        """
+        return self._submit(IngestionJob("rebuild" if rebuild else "refresh", None, None))
+
+    def submit_folder(self, folder_path: str, file_patterns: List[str]) -> IngestionJob:
+        """Queue ingestion of a folder; raises ValueError right away if it does not exist"""
+        if not Path(folder_path).exists():
+            raise ValueError(f"Folder does not exist: {folder_path}")
+        return self._submit(IngestionJob("folder", folder_path, file_patterns))
+
+    def submit_paths(self, paths: List[Path]) -> IngestionJob:
+        """Queue re-indexing of individual changed or deleted paths (used by the folder watcher)"""
+        return self._submit(IngestionJob("paths", None, None, paths=paths))
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[IngestionJob]:
+        """All known jobs, newest first"""
+        return list(reversed(self._jobs.values()))
+
+    def cancel(self, job_id: str) -> Optional[IngestionJob]:
+        """
+        Cancel a queued or running job. Files already committed stay indexed; a partly
+        written file is not in the manifest yet and is re-ingested by the next sync.
+        """
+        job = self._jobs.get(job_id)
+        if job is not None and not job.finished and job.task is not None:
+            job.task.cancel()
+            if job.status == QUEUED:
+                # The task may not have started yet, in which case _run never records the outcome
+                job.status = CANCELLED
+                job.finished_at = time.time()
+        return job
+
+    async def wait(self, job: IngestionJob, timeout: Optional[float] = None) -> IngestionJob:
+        """Wait for a job to finish (or the timeout); the job keeps running if the waiter is cancelled"""
+        if job.task is not None:
+            await asyncio.wait([job.task], timeout=timeout)
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        statuses = [job.status for job in self._jobs.values()]
+        return {
+            # Counts cover this worker only
+            "worker_pid": os.getpid(),
+            "running": statuses.count(RUNNING),
+            "queued": statuses.count(QUEUED),
+            "max_concurrent": self.max_concurrent,
+            "max_queued": self.max_queued
+        }
+
+    async def shutdown(self):
+        """Cancel every unfinished job and wait for them to stop"""
+        tasks = [job.task for job in self._jobs.values() if job.task is not None and not job.finished]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _submit(self, job: IngestionJob) -> IngestionJob:
+        # Running jobs fill the concurrency slots, everything else waits for one
+        unfinished = sum(1 for existing in self._jobs.values() if not existing.finished)
+        if unfinished >= self.max_concurrent + self.max_queued:
+            raise JobQueueFullError(f"Too many pending ingestion jobs ({unfinished})")
+
+        self._jobs[job.id] = job
+        job.task = asyncio.create_task(self._run(job))
+        self._prune()
+        logger.info(f"Queued ingestion job {job.id} ({job.kind})")
+        return job
+
+    async def _run(self, job: IngestionJob):
+        try:
+            async with self._semaphore:
+                job.status = RUNNING
+                job.started_at = time.time()
+                if job.kind == "refresh":
+                    job.result = await self.document_service.refresh_documents(progress=job.progress)
+                elif job.kind == "rebuild":
+                    job.result = await self.document_service.rebuild_index(progress=job.progress)
+                elif job.kind == "paths":
+                    job.result = await self.document_service.sync_paths(job.paths, progress=job.progress)
+                else:
+                    job.result = await self.document_service.process_documents(
+                        job.folder, job.file_patterns, progress=job.progress
+                    )
+                job.status = SUCCEEDED
+        except asyncio.CancelledError:
+            job.status = CANCELLED
+            logger.info(f"Ingestion job {job.id} cancelled")
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e)
+            logger.error(f"Ingestion job {job.id} failed: {str(e)}")
+        finally:
+            job.finished_at = time.time()
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond the history limit"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
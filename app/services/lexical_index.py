@@ -0,0 +1,121 @@
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Tuple
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lower-cased word tokens. Identifiers with underscores are kept whole and also
+    split into their parts, so `CHROMA_DB_PATH` matches both exactly and by word.
+    """
+    tokens = []
+    for word in _WORD_RE.findall(text.lower()):
+        tokens.append(word)
+        if "_" in word:
+            tokens.extend(part for part in word.split("_") if part)
+    return tokens
+
+
+class LexicalIndex:
+    """In-memory BM25 inverted index over chunks, maintained incrementally"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._docs: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def add(self, ids: Iterable[str], texts: Iterable[str], metadatas: Iterable[Dict[str, Any]]):
+        """Index chunks; re-adding an existing ID replaces it"""
+        for doc_id, text, metadata in zip(ids, texts, metadatas):
+            if doc_id in self._doc_lengths:
+                self._remove_one(doc_id)
+
+            term_counts = Counter(tokenize(text))
+            for term, count in term_counts.items():
+                self._postings.setdefault(term, {})[doc_id] = count
+
+            length = sum(term_counts.values())
+            self._doc_lengths[doc_id] = length
+            self._total_length += length
+            self._docs[doc_id] = (text, metadata)
+
+    def remove(self, ids: Iterable[str]):
+        """Drop chunks from the index"""
+        for doc_id in ids:
+            if doc_id in self._doc_lengths:
+                self._remove_one(doc_id)
+
+    def clear(self):
+        """Drop every chunk"""
+        self._postings.clear()
+        self._doc_lengths.clear()
+        self._docs.clear()
+        self._total_length = 0
+
+    def _remove_one(self, doc_id: str):
+        text, _ = self._docs.pop(doc_id)
+        for term in set(tokenize(text)):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(doc_id)
+
+    def search(self, query: str, k: int) -> List[Dict[str, Any]]:
+        """Top-k chunks by BM25 score, in the same shape as dense search results"""
+        doc_count = len(self._doc_lengths)
+        if not doc_count:
+            return []
+
+        avg_length = self._total_length / doc_count
+        scores: Dict[str, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [
+            {
+                "id": doc_id,
+                "content": self._docs[doc_id][0],
+                "metadata": self._docs[doc_id][1],
+                "lexical_score": score,
+                "rank": rank
+            }
+            for rank, (doc_id, score) in enumerate(top, 1)
+        ]
+
+
+def reciprocal_rank_fusion(result_lists: List[List[Dict[str, Any]]], k: int, rrf_k: int = 60) -> List[Dict[str, Any]]:
+    """Fuse ranked result lists by reciprocal rank; fields of the first occurrence win"""
+    fused: Dict[str, Dict[str, Any]] = {}
+    for results in result_lists:
+        for rank, doc in enumerate(results, 1):
+            entry = fused.get(doc["id"])
+            if entry is None:
+                entry = fused[doc["id"]] = {**doc, "rrf_score": 0.0}
+            else:
+                for key, value in doc.items():
+                    entry.setdefault(key, value)
+            entry["rrf_score"] += 1.0 / (rrf_k + rank)
+
+    ranked = sorted(fused.values(), key=lambda doc: doc["rrf_score"], reverse=True)[:k]
+    for rank, doc in enumerate(ranked, 1):
+        doc["rank"] = rank
+    return ranked
@@ -0,0 +1,92 @@
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Optional
+
+from app.core.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class CrossEncoderReranker:
+    """
+    Reranks retrieved candidates with a local cross-encoder in one batched call.
+    Scores are cached by (query hash, chunk ID), so repeated questions only score new chunks.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        executor: Executor,
+        cache_size: int = 10000,
+        batch_size: int = 32
+    ):
+        self.model_name = model_name
+        self.executor = executor
+        self.batch_size = batch_size
+        self.score_cache = LRUCache(maxsize=cache_size)
+        self._model = None
+        self._model_lock = threading.Lock()
+
+    def _get_model(self):
+        """Load the cross-encoder on first use"""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from sentence_transformers import CrossEncoder
+
+                    logger.info(f"Loading cross-encoder {self.model_name}")
+                    self._model = CrossEncoder(self.model_name, device="cpu")
+        return self._model
+
+    def score(self, query: str, docs: List[Dict[str, Any]]) -> List[float]:
+        """Relevance scores for (query, chunk) pairs, computing only uncached ones"""
+        query_hash = hashlib.sha256(" ".join(query.lower().split()).encode("utf-8")).hexdigest()[:16]
+        keys = [(query_hash, doc["id"]) for doc in docs]
+        scores: List[Optional[float]] = [self.score_cache.get(key) for key in keys]
+
+        missing = [i for i, value in enumerate(scores) if value is None]
+        if missing:
+            pairs = [(query, docs[i]["content"]) for i in missing]
+            computed = self._get_model().predict(pairs, batch_size=self.batch_size, show_progress_bar=False)
+            for i, value in zip(missing, computed):
+                scores[i] = float(value)
+                self.score_cache.set(keys[i], scores[i])
+
+        return scores
+
+    async def rerank(
+        self,
+        query: str,
+        docs: List[Dict[str, Any]],
+        k: int,
+        stats: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Return the top-k candidates by cross-encoder score"""
+        if not docs:
+            return docs
+
+        start = time.perf_counter()
+        hits_before = self.score_cache.hits
+        loop = asyncio.get_event_loop()
+        scores = await loop.run_in_executor(self.executor, self.score, query, docs)
+
+        ranked = sorted(
+            ({**doc, "rerank_score": score} for doc, score in zip(docs, scores)),
+            key=lambda doc: doc["rerank_score"],
+            reverse=True
+        )[:k]
+        for rank, doc in enumerate(ranked, 1):
+            doc["rank"] = rank
+
+        if stats is not None:
+            stats.update({
+                "rerank_candidates": len(docs),
+                "rerank_cache_hits": self.score_cache.hits - hits_before,
+                "rerank_ms": round((time.perf_counter() - start) * 1000, 2)
+            })
+
+        return ranked
@@ -0,0 +1,171 @@
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class VectorIndex:
+    """
+    In-process brute-force nearest-neighbour index over normalized chunk embeddings.
+    Vectors live in one contiguous (optionally memory-mapped) matrix, so a query is a
+    single matrix-vector product plus an argpartition for the top k. Scores follow
+    Chroma's default squared-L2 space, so results are interchangeable with `collection.query`.
+    """
+
+    def __init__(self, path: Optional[str] = None, dtype: str = "float32", initial_capacity: int = 1024):
+        if dtype not in ("float32", "float16"):
+            raise ValueError(f"Unsupported vector index dtype: {dtype}")
+
+        self.path = Path(path) if path else None
+        self.dtype = np.dtype(dtype)
+        self.initial_capacity = initial_capacity
+
+        self._matrix: Optional[np.ndarray] = None
+        self._size = 0
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._docs: List[Tuple[str, Dict[str, Any]]] = []
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def dimension(self) -> int:
+        return self._matrix.shape[1] if self._matrix is not None else 0
+
+    def add(
+        self,
+        ids: Iterable[str],
+        texts: Iterable[str],
+        metadatas: Iterable[Dict[str, Any]],
+        embeddings: Iterable[List[float]]
+    ):
+        """Insert chunks; re-adding an existing ID overwrites its row"""
+        ids = list(ids)
+        if not ids:
+            return
+
+        vectors = np.asarray(list(embeddings), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.clip(norms, 1e-12, None)
+
+        new_count = sum(1 for doc_id in dict.fromkeys(ids) if doc_id not in self._rows)
+        self._ensure_capacity(self._size + new_count, vectors.shape[1])
+
+        for doc_id, text, metadata, vector in zip(ids, texts, metadatas, vectors):
+            row = self._rows.get(doc_id)
+            if row is None:
+                row = self._size
+                self._size += 1
+                self._rows[doc_id] = row
+                self._ids.append(doc_id)
+                self._docs.append((text, metadata))
+            else:
+                self._docs[row] = (text, metadata)
+            self._matrix[row] = vector
+
+    def remove(self, ids: Iterable[str]):
+        """Drop chunks, moving the last row into each freed slot to keep the matrix dense"""
+        for doc_id in ids:
+            row = self._rows.pop(doc_id, None)
+            if row is None:
+                continue
+
+            last = self._size - 1
+            if row != last:
+                moved_id = self._ids[last]
+                self._matrix[row] = self._matrix[last]
+                self._ids[row] = moved_id
+                self._docs[row] = self._docs[last]
+                self._rows[moved_id] = row
+
+            self._ids.pop()
+            self._docs.pop()
+            self._size -= 1
+
+    def clear(self):
+        """Drop every chunk (the allocated matrix is kept for reuse)"""
+        self._size = 0
+        self._ids.clear()
+        self._rows.clear()
+        self._docs.clear()
+
+    def search(self, query_embedding: List[float], k: int) -> List[Dict[str, Any]]:
+        """Top-k chunks by cosine similarity, in the same shape as dense Chroma results"""
+        if not self._size or k <= 0:
+            return []
+
+        query = np.array(query_embedding, dtype=np.float32)
+        query /= max(float(np.linalg.norm(query)), 1e-12)
+
+        similarities = self._matrix[:self._size] @ query.astype(self.dtype, copy=False)
+        similarities = similarities.astype(np.float32, copy=False)
+
+        k = min(k, self._size)
+        if k < self._size:
+            top = np.argpartition(-similarities, k - 1)[:k]
+        else:
+            top = np.arange(self._size)
+        top = top[np.argsort(-similarities[top], kind="stable")]
+
+        results = []
+        for rank, row in enumerate(top, 1):
+            # Squared L2 between unit vectors, as Chroma reports it
+            distance = 2.0 - 2.0 * float(similarities[row])
+            text, metadata = self._docs[row]
+            results.append({
+                "id": self._ids[row],
+                "content": text,
+                "metadata": metadata,
+                "score": 1 - distance,
+                "rank": rank
+            })
+        return results
+
+    def _ensure_capacity(self, needed: int, dimension: int):
+        """Grow the matrix geometrically so appends stay amortized O(1)"""
+        if self._matrix is not None:
+            if dimension != self._matrix.shape[1]:
+                raise ValueError(
+                    f"Embedding dimension {dimension} does not match the index ({self._matrix.shape[1]})"
+                )
+            if needed <= self._matrix.shape[0]:
+                return
+
+        capacity = max(self.initial_capacity, needed)
+        if self._matrix is not None:
+            capacity = max(capacity, 2 * self._matrix.shape[0])
+
+        matrix = self._allocate(capacity, dimension)
+        if self._matrix is not None and self._size:
+            matrix[:self._size] = self._matrix[:self._size]
+        self._matrix = matrix
+        logger.debug(f"Vector index capacity is now {capacity} x {dimension} ({self.dtype})")
+
+    def _allocate(self, capacity: int, dimension: int) -> np.ndarray:
+        """Anonymous array, or a file-backed memmap when the index has a path"""
+        if self.path is None:
+            return np.zeros((capacity, dimension), dtype=self.dtype)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Private to this process and unlinked right away: the mapping stays valid, several
+        # workers (or a reload) never share the file, and nothing is left behind on a crash
+        file_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.{id(self)}")
+        matrix = np.memmap(file_path, dtype=self.dtype, mode="w+", shape=(capacity, dimension))
+        os.unlink(file_path)
+        return matrix
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and memory footprint"""
+        return {
+            "chunks": self._size,
+            "capacity": self._matrix.shape[0] if self._matrix is not None else 0,
+            "dimension": self.dimension,
+            "dtype": str(self.dtype),
+            "memory_mapped": self.path is not None,
+            "bytes": int(self._matrix.nbytes) if self._matrix is not None else 0
+        }